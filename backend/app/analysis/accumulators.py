@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Optional
+
+# Streaming counterparts of the *_features_from_series functions. Each
+# accumulator takes one series row (the per-frame values keyed like
+# extract_common_series) at a time and can report the same feature dict as
+# the batch function over all rows pushed so far, or over the last `window`
+# rows when a window is given. Every push is O(1) (amortized for windows).
+
+
+class RunningExtreme:
+    """Running argmax (or argmin) that keeps the first index on ties, like `_argmax`/`_argmin`.
+
+    Without a window only the best entry is kept. With a window, a monotonic
+    deque holds candidates so the oldest one can expire in amortized O(1).
+    """
+
+    def __init__(self, mode: str = "max", window: Optional[int] = None) -> None:
+        self._sign = 1.0 if mode == "max" else -1.0
+        self.window = window
+        self._best: Optional[tuple[float, int, Any]] = None
+        self._candidates: deque[tuple[float, int, Any]] = deque()
+
+    def push(self, value: float, index: int, payload: Any = None) -> None:
+        key = self._sign * value
+        if self.window is None:
+            if self._best is None or key > self._sign * self._best[0]:
+                self._best = (value, index, payload)
+            return
+
+        while self._candidates and self._sign * self._candidates[-1][0] < key:
+            self._candidates.pop()
+        self._candidates.append((value, index, payload))
+        while self._candidates[0][1] <= index - self.window:
+            self._candidates.popleft()
+
+    def _current(self) -> tuple[float, int, Any]:
+        return self._best if self.window is None else self._candidates[0]
+
+    @property
+    def value(self) -> float:
+        return self._current()[0]
+
+    @property
+    def index(self) -> int:
+        return self._current()[1]
+
+    @property
+    def payload(self) -> Any:
+        return self._current()[2]
+
+
+class RunningSpan:
+    """max - min of a series."""
+
+    def __init__(self, window: Optional[int] = None) -> None:
+        self.max = RunningExtreme("max", window)
+        self.min = RunningExtreme("min", window)
+
+    def push(self, value: float, index: int, payload: Any = None) -> None:
+        self.max.push(value, index, payload)
+        self.min.push(value, index, payload)
+
+    @property
+    def span(self) -> float:
+        return self.max.value - self.min.value
+
+
+class RunningStats:
+    """Welford mean/variance, with removal of expired samples when windowed."""
+
+    def __init__(self, window: Optional[int] = None) -> None:
+        self.window = window
+        self._values: deque[float] = deque()
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def push(self, value: float) -> None:
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (value - self.mean)
+
+        if self.window is None:
+            return
+        self._values.append(value)
+        if len(self._values) > self.window:
+            self._remove(self._values.popleft())
+
+    def _remove(self, value: float) -> None:
+        if self.n <= 1:
+            self.n, self.mean, self._m2 = 0, 0.0, 0.0
+            return
+        old_mean = self.mean
+        self.n -= 1
+        self.mean = (old_mean * (self.n + 1) - value) / self.n
+        self._m2 = max(0.0, self._m2 - (value - old_mean) * (value - self.mean))
+
+    @property
+    def pstdev(self) -> float:
+        return math.sqrt(self._m2 / self.n) if self.n > 1 else 0.0
+
+
+class _FeatureAccumulator(ABC):
+    def __init__(self, window: Optional[int] = None) -> None:
+        self.window = window
+        self.count = 0
+
+    def push(self, row: dict[str, float]) -> None:
+        self._push(row, self.count)
+        self.count += 1
+
+    @abstractmethod
+    def _push(self, row: dict[str, float], i: int) -> None:
+        """Fold frame `i` into the running state."""
+
+    def __len__(self) -> int:
+        return self.count if self.window is None else min(self.count, self.window)
+
+    @abstractmethod
+    def features(self) -> dict[str, float]:
+        """Features of the frames pushed so far (the last `window` of them when windowed)."""
+
+
+class SquatAccumulator(_FeatureAccumulator):
+    def __init__(self, window: Optional[int] = None) -> None:
+        super().__init__(window)
+        self.hip_y = RunningSpan(window)
+        self.min_knee = RunningExtreme("min", window)
+        self.nose_x = RunningStats(window)
+        self._hip_history: deque[float] = deque(maxlen=window or 1)
+
+    def _push(self, row: dict[str, float], i: int) -> None:
+        self.hip_y.push(row["hip_y"], i, (row["trunk"], row["left_knee"], row["right_knee"]))
+        self.min_knee.push(row["avg_knee"], i)
+        self.nose_x.push(row["nose_x"])
+        if self.window is not None or not self._hip_history:
+            self._hip_history.append(row["hip_y"])
+
+    def features(self) -> dict[str, float]:
+        bottom = self.hip_y.max
+        trunk, left_knee, right_knee = bottom.payload
+        return {
+            "depth_ratio": (bottom.value - self._hip_history[0]) / (self.hip_y.span + 1e-6),
+            "min_knee_angle": self.min_knee.value,
+            "trunk_angle_bottom": trunk,
+            "knee_symmetry": abs(left_knee - right_knee),
+            "head_stability": self.nose_x.pstdev,
+        }
+
+
+class CoverDriveAccumulator(_FeatureAccumulator):
+    def __init__(self, fps: float, window: Optional[int] = None) -> None:
+        super().__init__(window)
+        self.fps = fps
+        self.wrist_x = RunningSpan(window)
+        self.hip_x = RunningSpan(window)
+        self.min_trunk = RunningExtreme("min", window)
+        self.nose_x = RunningStats(window)
+
+    def _push(self, row: dict[str, float], i: int) -> None:
+        self.wrist_x.push(row["wrist_x"], i, row["left_knee"])
+        self.hip_x.push(row["hip_x"], i)
+        self.min_trunk.push(row["trunk"], i)
+        self.nose_x.push(row["nose_x"])
+
+    def features(self) -> dict[str, float]:
+        impact = self.wrist_x.max
+        delay_seconds = max(0.0, (self.hip_x.max.index - impact.index) / max(self.fps, 1.0))
+        return {
+            "head_stability": self.nose_x.pstdev,
+            "front_knee_angle_impact": impact.payload,
+            "bat_swing_compactness": self.wrist_x.span / (self.hip_x.span + 1e-6),
+            "weight_transfer_delay": delay_seconds,
+            "follow_through_alignment": self.min_trunk.value,
+        }
+
+
+class PushupAccumulator(_FeatureAccumulator):
+    def __init__(self, window: Optional[int] = None) -> None:
+        super().__init__(window)
+        self.avg_elbow = RunningSpan(window)
+        self.torso = RunningStats(window)
+        self.nose_x = RunningStats(window)
+
+    def _push(self, row: dict[str, float], i: int) -> None:
+        self.avg_elbow.push((row["left_elbow"] + row["right_elbow"]) / 2.0, i)
+        self.torso.push(row["shoulder_y"] - row["hip_y"])
+        self.nose_x.push(row["nose_x"])
+
+    def features(self) -> dict[str, float]:
+        return {
+            "min_elbow_angle": self.avg_elbow.min.value,
+            "elbow_range_of_motion": self.avg_elbow.span,
+            "torso_line_stability": self.torso.pstdev,
+            "head_stability": self.nose_x.pstdev,
+        }
+
+
+class BowlingAccumulator(_FeatureAccumulator):
+    def __init__(self, window: Optional[int] = None) -> None:
+        super().__init__(window)
+        self.release = RunningExtreme("min", window)
+        self.shoulder = RunningExtreme("min", window)
+        self.trunk = RunningSpan(window)
+        self.hip_velocity = RunningSpan(window)
+
+    def _push(self, row: dict[str, float], i: int) -> None:
+        self.release.push(row["wrist_y"], i)
+        self.shoulder.push(row["shoulder_y"], i)
+        self.trunk.push(row["trunk"], i)
+        self.hip_velocity.push(row["hip_velocity"], i)
+
+    def features(self) -> dict[str, float]:
+        return {
+            "release_height_index": 1.0 - self.release.value,
+            "trunk_rotation_span": self.trunk.span,
+            "hip_drive_velocity_span": self.hip_velocity.span,
+            "release_timing_index": abs(self.release.index - self.shoulder.index) / max(len(self), 1),
+        }
+
+
+class ActivityDetectorAccumulator(_FeatureAccumulator):
+    """Streaming inputs for `detect_activity_from_series`: the three spans and mean torso thickness."""
+
+    def __init__(self, window: Optional[int] = None) -> None:
+        super().__init__(window)
+        self.hip_y = RunningSpan(window)
+        self.wrist_x = RunningSpan(window)
+        self.wrist_y = RunningSpan(window)
+        self.torso = RunningStats(window)
+
+    def _push(self, row: dict[str, float], i: int) -> None:
+        self.hip_y.push(row["hip_y"], i)
+        self.wrist_x.push(row["wrist_x"], i)
+        self.wrist_y.push(row["wrist_y"], i)
+        self.torso.push(abs(row["shoulder_y"] - row["hip_y"]))
+
+    def features(self) -> dict[str, float]:
+        return {
+            "hip_span": self.hip_y.span,
+            "wrist_span": self.wrist_x.span,
+            "wrist_vertical_span": self.wrist_y.span,
+            "torso_thickness": self.torso.mean,
+        }
+
+
+def feature_accumulator(activity: str, fps: float = 30.0, window: Optional[int] = None) -> _FeatureAccumulator:
+    if activity == "squat":
+        return SquatAccumulator(window)
+    if activity == "cricket_cover_drive":
+        return CoverDriveAccumulator(fps, window)
+    if activity == "pushup":
+        return PushupAccumulator(window)
+    return BowlingAccumulator(window)
@@ -1,23 +1,40 @@
 from __future__ import annotations
 
-from app.analysis.angles import midpoint
+from app.analysis.accumulators import ActivityDetectorAccumulator
+from app.analysis.features import extract_common_series
 from app.schemas import FramePose
 
+ACTIVITIES = {"squat", "cricket_cover_drive", "pushup", "bowling"}
 
-def detect_activity(frames: list[FramePose], hint: str) -> str:
-    if hint in {"squat", "cricket_cover_drive", "pushup", "bowling"}:
+# Sliding-window segmentation for sessions that mix activities: every hop is
+# labelled from the window centred on it, and runs shorter than the minimum
+# segment length are absorbed into their neighbour.
+SEGMENT_WINDOW_S = 3.0
+SEGMENT_HOP_S = 0.5
+MIN_SEGMENT_S = 3.0
+# Floor for window and segment lengths, however few frames a second the clip has.
+MIN_SEGMENT_FRAMES = 10
+_DETECTOR_KEYS = ("hip_y", "wrist_x", "wrist_y", "shoulder_y")
+
+
+def detect_activity_from_series(series: dict[str, list[float]], hint: str) -> str:
+    if hint in ACTIVITIES:
         return hint
 
-    hip_y = [midpoint(f, "left_hip", "right_hip")[1] for f in frames]
-    wrist_x = [midpoint(f, "left_wrist", "right_wrist")[0] for f in frames]
-    wrist_y = [midpoint(f, "left_wrist", "right_wrist")[1] for f in frames]
-    shoulder_y = [midpoint(f, "left_shoulder", "right_shoulder")[1] for f in frames]
+    hip_y = series["hip_y"]
+    wrist_x = series["wrist_x"]
+    wrist_y = series["wrist_y"]
+    shoulder_y = series["shoulder_y"]
 
-    hip_span = max(hip_y) - min(hip_y)
-    wrist_span = max(wrist_x) - min(wrist_x)
-    wrist_vertical_span = max(wrist_y) - min(wrist_y)
-    torso_thickness = sum(abs(sh - hip) for sh, hip in zip(shoulder_y, hip_y)) / max(len(frames), 1)
+    return classify_activity(
+        hip_span=max(hip_y) - min(hip_y),
+        wrist_span=max(wrist_x) - min(wrist_x),
+        wrist_vertical_span=max(wrist_y) - min(wrist_y),
+        torso_thickness=sum(abs(sh - hip) for sh, hip in zip(shoulder_y, hip_y)) / max(len(hip_y), 1),
+    )
 
+
+def classify_activity(hip_span: float, wrist_span: float, wrist_vertical_span: float, torso_thickness: float) -> str:
     if torso_thickness < 0.11 and wrist_vertical_span > 0.08:
         return "pushup"
 
@@ -27,3 +44,75 @@ def detect_activity(frames: list[FramePose], hint: str) -> str:
     if hip_span > wrist_span * 0.8:
         return "squat"
     return "cricket_cover_drive"
+
+
+def frame_rate(timestamps: list[float], fps: float) -> float:
+    """Frames per second measured from the timestamps; `fps` is only the fallback for flat timestamps."""
+    if len(timestamps) > 1:
+        span = timestamps[-1] - timestamps[0]
+        if span > 0:
+            return (len(timestamps) - 1) / span
+    return fps if fps > 0 else 30.0
+
+
+def activity_segments(
+    series: dict[str, list[float]],
+    fps: float,
+    hint: str,
+    window_s: float = SEGMENT_WINDOW_S,
+    hop_s: float = SEGMENT_HOP_S,
+    min_segment_s: float = MIN_SEGMENT_S,
+) -> list[tuple[str, int, int]]:
+    """Activity timeline as (activity, start, end) frame ranges covering the clip, end exclusive.
+
+    One windowed `ActivityDetectorAccumulator` slides over the extracted
+    series, so the whole timeline costs a single O(n) pass. Window, hop and
+    minimum segment lengths come from the frame timestamps rather than the
+    client's `fps`. A clip that stays one segment, or is too short to hold two,
+    keeps the whole-clip label from `detect_activity_from_series`.
+    """
+    n = len(series["hip_y"])
+    rate = frame_rate(series["timestamps"], fps)
+    window = min(n, max(MIN_SEGMENT_FRAMES, round(window_s * rate)))
+    hop = max(1, round(hop_s * rate), window // 8)
+    min_len = max(MIN_SEGMENT_FRAMES, round(min_segment_s * rate))
+    if hint in ACTIVITIES or n < 2 * min_len:
+        return [(detect_activity_from_series(series, hint), 0, n)]
+
+    detector = ActivityDetectorAccumulator(window)
+    columns = [series[k] for k in _DETECTOR_KEYS]
+    pushed = 0
+
+    runs: list[list] = []
+    for start in range(0, n, hop):
+        end = min(start + hop, n)
+        target = min(n, (start + end) // 2 + window // 2)
+        while pushed < target:
+            detector.push(dict(zip(_DETECTOR_KEYS, (c[pushed] for c in columns))))
+            pushed += 1
+        label = classify_activity(**detector.features())
+
+        if runs and runs[-1][0] == label:
+            runs[-1][2] = end
+        else:
+            runs.append([label, start, end])
+
+    merged: list[list] = []
+    for label, start, end in runs:
+        if merged and (end - start < min_len or merged[-1][0] == label):
+            merged[-1][2] = end
+        elif merged and merged[-1][2] - merged[-1][1] < min_len:
+            # A short leading run takes the label of what follows it.
+            merged[-1][0], merged[-1][2] = label, end
+        else:
+            merged.append([label, start, end])
+
+    if len(merged) == 1:
+        return [(detect_activity_from_series(series, hint), 0, n)]
+    return [(label, start, end) for label, start, end in merged]
+
+
+def detect_activity(frames: list[FramePose], hint: str) -> str:
+    if hint in ACTIVITIES:
+        return hint
+    return detect_activity_from_series(extract_common_series(frames), hint)
@@ -2,11 +2,16 @@ from __future__ import annotations
 
 import json
 import os
+import queue
 import threading
+import time
 from collections import Counter, deque
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Optional, Sequence
 
+import numpy as np
+
+from app.metrics import CNN_ERRORS, stage
 from app.schemas import FramePose
 
 _SKELETON_EDGES = (
@@ -30,25 +35,163 @@ _SKELETON_EDGES = (
 
 _DEFAULT_CLASSES = {0: "drive", 1: "legglance-flick", 2: "pullshot", 3: "sweep"}
 
+_BACKGROUND_RGB = (10, 14, 20)
+_EDGE_RGB = (80, 190, 255)
+_JOINT_RGB = (0, 255, 157)
+_EDGE_A = np.array([a for a, _ in _SKELETON_EDGES])
+_EDGE_B = np.array([b for _, b in _SKELETON_EDGES])
+# Offsets into the (at most 5x5) bounding box of a joint disc.
+_BOX_OFFSETS = np.arange(5)
+
+
+def _round_up(v: np.ndarray) -> np.ndarray:
+    """C-style ROUND_UP from PIL's Draw.c (halves away from zero)."""
+    return np.where(v >= 0, np.floor(v + np.float32(0.5)), -np.floor(np.abs(v) + np.float32(0.5)))
+
+
+def _round_down(v: np.ndarray) -> np.ndarray:
+    """C-style ROUND_DOWN from PIL's Draw.c (halves towards zero)."""
+    return np.where(v >= 0, np.ceil(v - np.float32(0.5)), -np.ceil(np.abs(v) - np.float32(0.5)))
+
+
+def _edge_spans(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Scanline spans of PIL's width-2 `draw.line` for (N, 2) integer endpoint arrays.
+
+    PIL draws a wide line as a parallelogram with integer corners, offset one
+    pixel to one side of the segment, and fills it row by row in float32. This
+    repeats that arithmetic so the covered pixels match exactly. Returns
+    (edge, y, x_start, x_end) for every row the parallelogram spans.
+    """
+    d = (b - a).astype(np.float64)
+    length = np.hypot(d[:, 0], d[:, 1])
+    ratio = np.divide(1.0, length, out=np.zeros_like(length), where=length > 0)
+    off_x = _round_down(ratio * d[:, 1]).astype(np.int64)
+    off_y = _round_down(ratio * d[:, 0]).astype(np.int64)
+    zero = np.zeros_like(off_x)
+    shift_y = np.stack([zero, off_y], axis=1)
+    shift_x = np.stack([off_x, zero], axis=1)
+    corners = np.stack([a + shift_y, b + shift_y, b + shift_x, a + shift_x], axis=1)  # (N, 4, 2)
+
+    y_lo = corners[:, :, 1].min(axis=1)
+    heights = corners[:, :, 1].max(axis=1) - y_lo + 1
+    edge = np.repeat(np.arange(len(a)), heights)
+    y = np.repeat(y_lo - np.cumsum(heights) + heights, heights) + np.arange(heights.sum())
+    p = corners[edge]
+    q = np.roll(corners, -1, axis=1)[edge]
+    yy = y[:, None]
+    side_dy = q[..., 1] - p[..., 1]
+    crosses = (yy >= np.minimum(p[..., 1], q[..., 1])) & (yy <= np.maximum(p[..., 1], q[..., 1]))
+    slope = np.divide(q[..., 0] - p[..., 0], side_dy, out=np.zeros(side_dy.shape), where=side_dy != 0).astype(np.float32)
+    x = (yy - p[..., 1]).astype(np.float32) * slope + p[..., 0].astype(np.float32)
+    flat = side_dy == 0
+    left = np.where(crosses, np.where(flat, np.minimum(p[..., 0], q[..., 0]), x), np.inf).min(axis=1)
+    right = np.where(crosses, np.where(flat, np.maximum(p[..., 0], q[..., 0]), x), -np.inf).max(axis=1)
+    return edge, y, _round_up(left.astype(np.float32)).astype(np.int64), _round_down(right.astype(np.float32)).astype(np.int64)
+
+
+def rasterize_poses(
+    points: np.ndarray,
+    image_size: int = 224,
+    mean: Sequence[float] = (0.485, 0.456, 0.406),
+    std: Sequence[float] = (0.229, 0.224, 0.225),
+) -> np.ndarray:
+    """Draw a (B, 17, 2) batch of normalized poses into a normalized (B, 3, S, S) float32 tensor.
+
+    Pixel-for-pixel the same drawing as `render_pose_to_image` (which the model
+    was trained on), but for the whole batch at once and without PIL. Each
+    frame is drawn independently of the others in the batch.
+    """
+    n = len(points)
+    size = image_size
+    xy = np.clip(np.asarray(points, dtype=np.float64)[:, :, :2], 0.0, 1.0) * (size - 1)
+    # PIL truncates the float line endpoints it is given to ints.
+    pts = xy.astype(np.int64)
+
+    palette = np.array([_BACKGROUND_RGB, _EDGE_RGB, _JOINT_RGB], dtype=np.float32) / 255.0
+    palette = (palette - np.asarray(mean, dtype=np.float32)) / np.asarray(std, dtype=np.float32)
+    out = np.empty((n, 3, size, size), dtype=np.float32)
+    out[:] = palette[0][None, :, None, None]
+    flat_out = out.reshape(-1)
+    plane = size * size
+    frame_base = np.arange(n, dtype=np.int64) * (3 * plane)
+
+    # Edges: expand the clipped per-row spans into flat pixel indices.
+    edge, edge_y, x0, x1 = _edge_spans(pts[:, _EDGE_A].reshape(-1, 2), pts[:, _EDGE_B].reshape(-1, 2))
+    x0 = np.maximum(x0, 0)
+    x1 = np.minimum(x1, size - 1)
+    ok = (edge_y >= 0) & (edge_y < size) & (x1 >= x0)
+    lengths = (x1 - x0 + 1)[ok]
+    starts = frame_base[edge[ok] // len(_SKELETON_EDGES)] + edge_y[ok] * size + x0[ok]
+    line_idx = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+    # Joints: PIL's ellipse of the truncated box (x-2, y-2, x+2, y+2) is that
+    # box minus its four corner pixels.
+    lo = np.trunc(xy - 2.0).astype(np.int64)
+    extent = np.trunc(xy + 2.0).astype(np.int64) - lo  # (B, 17, 2), 3 or 4
+    ox = _BOX_OFFSETS[:, None]
+    oy = _BOX_OFFSETS[None, :]
+    wx = extent[..., 0, None, None]
+    wy = extent[..., 1, None, None]
+    jx = lo[..., 0, None, None] + ox
+    jy = lo[..., 1, None, None] + oy
+    corner = ((ox == 0) | (ox == wx)) & ((oy == 0) | (oy == wy))
+    inside = (ox <= wx) & (oy <= wy) & ~corner & (jx >= 0) & (jx < size) & (jy >= 0) & (jy < size)
+    joint_idx = (frame_base[:, None, None, None] + jy * size + jx)[inside]
+
+    # Joints are written after edges so they sit on top, as in the PIL renderer.
+    for ch in range(3):
+        flat_out[line_idx + ch * plane] = palette[1, ch]
+        flat_out[joint_idx + ch * plane] = palette[2, ch]
+    return out
+
+
+class ShotSmoother:
+    """Majority-vote smoothing window owned by a single request or live session."""
+
+    def __init__(self, window_size: int) -> None:
+        self._history: deque[tuple[str, float]] = deque(maxlen=window_size)
+
+    def reset(self) -> None:
+        self._history.clear()
+
+    def update(self, label: str, confidence: float) -> dict[str, Any]:
+        self._history.append((label, confidence))
+        counts = Counter(lbl for lbl, _ in self._history)
+        winner = counts.most_common(1)[0][0]
+        winner_confs = [conf for lbl, conf in self._history if lbl == winner]
+        avg_conf = sum(winner_confs) / max(len(winner_confs), 1)
+        return {"label": winner, "confidence": round(float(avg_conf), 4), "source": "cnn"}
+
 
 class CricketCNNInference:
+    """Shared, lazily loaded shot CNN.
+
+    The loaded model is read-only after `_ensure_loaded` publishes it, so many
+    threads can run inference concurrently without taking `_lock`. Temporal
+    smoothing lives in a per-caller `ShotSmoother`.
+    """
+
     def __init__(self) -> None:
         self.enabled = os.getenv("CNN_SHOT_ENABLED", "1").lower() not in {"0", "false", "no"}
         self.window_size = max(3, int(os.getenv("CNN_WINDOW_SIZE", "7")))
         self.model_dir = Path(os.getenv("CNN_MODEL_DIR", "backend/models"))
         self.weights_path = self.model_dir / "cricket_shot_model.pth"
+        self.torchscript_path = self.model_dir / "cricket_shot_model.ts"
+        self.int8_path = self.model_dir / "cricket_shot_model_int8.ts"
+        # auto = int8 TorchScript, then fp32 TorchScript, then the state_dict; or force one of them.
+        self.model_format = os.getenv("CNN_MODEL_FORMAT", "auto").lower()
         self.mapping_path = self.model_dir / "class_mapping.json"
         self.preprocess_path = self.model_dir / "preprocess_config.json"
         self.model_config_path = self.model_dir / "model_config.json"
 
         self._lock = threading.Lock()
-        self._history: deque[tuple[str, float]] = deque(maxlen=self.window_size)
         self._load_attempted = False
         self._load_error: Optional[str] = None
+        self._load_ms: Optional[float] = None
+        self._warmup_ms: Optional[float] = None
 
         self._torch = None
         self._transforms = None
-        self._image_cls = None
         self._model = None
         self._device = "cpu"
         self._class_mapping: dict[int, str] = dict(_DEFAULT_CLASSES)
@@ -57,16 +200,23 @@ class CricketCNNInference:
         self._mean = [0.485, 0.456, 0.406]
         self._std = [0.229, 0.224, 0.225]
         self._arch = "mobilenet_v3_small"
+        self._artifacts: dict[str, dict[str, Any]] = {}
+        self._format: Optional[str] = None
+        self._channels_last = False
 
     def _load_dependencies(self) -> None:
         import torch  # type: ignore
-        from PIL import Image  # type: ignore
-        from torchvision import models, transforms  # type: ignore
 
         self._torch = torch
-        self._image_cls = Image.Image
-        self._models = models
+
+    def _ensure_image_pipeline(self) -> None:
+        """PIL/torchvision preprocessing for raw image frames; pose input is rasterized without them."""
+        if self._preprocess is not None:
+            return
+        from torchvision import transforms  # type: ignore
+
         self._transforms = transforms
+        self._build_preprocess()
 
     def _load_metadata(self) -> None:
         if self.mapping_path.exists():
@@ -83,9 +233,42 @@ class CricketCNNInference:
         if self.model_config_path.exists():
             cfg = json.loads(self.model_config_path.read_text())
             self._arch = str(cfg.get("arch", self._arch))
+            self._artifacts = dict(cfg.get("artifacts", {}))
+
+    def _load_model(self):
+        """Load the preferred exported TorchScript artifact, falling back to rebuilding the eager model."""
+        torch = self._torch
+        candidates = [("int8", self.int8_path), ("torchscript", self.torchscript_path), ("eager", self.weights_path)]
+        if self.model_format != "auto":
+            candidates = [c for c in candidates if c[0] == self.model_format]
+
+        for fmt, path in candidates:
+            meta = self._artifacts.get(fmt, {})
+            if fmt == "eager":
+                if not path.exists():
+                    raise FileNotFoundError(f"CNN weights not found: {path}")
+                model = self._build_model(self._arch, len(self._class_mapping))
+                model.load_state_dict(torch.load(path, map_location=self._device))
+                model.to(self._device)
+            else:
+                if not path.exists():
+                    continue
+                if fmt == "int8":
+                    # Quantized kernels are CPU-only and tied to the engine used at export.
+                    engine = meta.get("engine", "x86")
+                    if self._device != "cpu" or engine not in torch.backends.quantized.supported_engines:
+                        continue
+                    torch.backends.quantized.engine = engine
+                model = torch.jit.load(str(path), map_location=self._device)
+            model.eval()
+            self._format = fmt
+            self._channels_last = bool(meta.get("channels_last", False))
+            return model
+        raise FileNotFoundError(f"No usable CNN artifact for CNN_MODEL_FORMAT={self.model_format} in {self.model_dir}")
 
     def _build_model(self, arch: str, num_classes: int):
-        models = self._models
+        from torchvision import models  # type: ignore
+
         if arch == "mobilenet_v3_small":
             model = models.mobilenet_v3_small(weights=None)
             in_features = model.classifier[3].in_features
@@ -121,6 +304,8 @@ class CricketCNNInference:
         if not self.enabled:
             return False
 
+        # Hot path: `_load_attempted` is set only after the load outcome is in
+        # `_model`, and neither changes again, so once it reads true no lock is needed.
         if self._load_attempted:
             return self._model is not None
 
@@ -128,34 +313,63 @@ class CricketCNNInference:
             if self._load_attempted:
                 return self._model is not None
 
-            self._load_attempted = True
+            start = time.perf_counter()
             try:
-                self._load_dependencies()
-                self._load_metadata()
-
-                if not self.weights_path.exists():
-                    raise FileNotFoundError(f"CNN weights not found: {self.weights_path}")
-
-                self._device = "cuda" if self._torch.cuda.is_available() else "cpu"
-                self._build_preprocess()
-                self._model = self._build_model(self._arch, len(self._class_mapping))
-                state = self._torch.load(self.weights_path, map_location=self._device)
-                self._model.load_state_dict(state)
-                self._model.to(self._device)
-                self._model.eval()
+                with stage("cnn_load"):
+                    self._load_dependencies()
+                    self._load_metadata()
+                    self._device = "cuda" if self._torch.cuda.is_available() else "cpu"
+                    model = self._load_model()
+                    # Publish only a fully initialized model to lock-free readers.
+                    self._model = model
             except Exception as exc:
+                CNN_ERRORS.inc("load")
                 self._load_error = str(exc)
                 self._model = None
+            finally:
+                self._load_ms = round((time.perf_counter() - start) * 1000.0, 1)
+                self._load_attempted = True
         return self._model is not None
 
+    def warm_up(self) -> bool:
+        """Load the model and push one dummy window through it so the first request pays neither cost."""
+        if not self._ensure_loaded():
+            return False
+        start = time.perf_counter()
+        try:
+            points = np.full((self.window_size, 17, 2), 0.5, dtype=np.float32)
+            self._classify_tensor(self._torch.from_numpy(self.render_poses(points)))
+        except Exception as exc:
+            CNN_ERRORS.inc("warmup")
+            self._load_error = f"warm-up failed: {exc}"
+            return False
+        self._warmup_ms = round((time.perf_counter() - start) * 1000.0, 1)
+        return True
+
+    def status(self) -> dict[str, Any]:
+        if not self.enabled:
+            state = "disabled"
+        elif self._model is not None:
+            state = "ready" if self._warmup_ms is not None else "loaded"
+        else:
+            state = "failed" if self._load_attempted else "not_loaded"
+        return {
+            "state": state,
+            "arch": self._arch,
+            "format": self._format,
+            "device": self._device,
+            "load_error": self._load_error,
+            "load_ms": self._load_ms,
+            "warmup_ms": self._warmup_ms,
+        }
+
     def _to_pil_image(self, frame: Any):
         if frame is None:
             return None
 
         from PIL import Image  # type: ignore
-        import numpy as np  # type: ignore
 
-        if isinstance(frame, self._image_cls):
+        if isinstance(frame, Image.Image):
             return frame.convert("RGB")
         if isinstance(frame, np.ndarray):
             if frame.ndim == 2:
@@ -163,56 +377,242 @@ class CricketCNNInference:
             return Image.fromarray(frame[..., :3]).convert("RGB")
         return None
 
-    def reset(self) -> None:
-        self._history.clear()
-
-    def _smooth(self, label: str, confidence: float) -> dict[str, Any]:
-        self._history.append((label, confidence))
-        counts = Counter(lbl for lbl, _ in self._history)
-        winner = counts.most_common(1)[0][0]
-        winner_confs = [conf for lbl, conf in self._history if lbl == winner]
-        avg_conf = sum(winner_confs) / max(len(winner_confs), 1)
-        return {"label": winner, "confidence": round(float(avg_conf), 4), "source": "cnn"}
+    def render_poses(self, points: np.ndarray) -> np.ndarray:
+        """(n, 17, 2) keypoints as the model's normalized (n, 3, size, size) input batch."""
+        return rasterize_poses(points, self._input_size, self._mean, self._std)
+
+    def new_smoother(self) -> ShotSmoother:
+        return ShotSmoother(self.window_size)
+
+    def _classify_batch(self, frames: list[Any]) -> list[Optional[tuple[str, float]]]:
+        """Run one forward pass over all convertible frames; unconvertible ones map to None."""
+        self._ensure_image_pipeline()
+        images = [self._to_pil_image(f) for f in frames]
+        valid = [i for i, img in enumerate(images) if img is not None]
+        out: list[Optional[tuple[str, float]]] = [None] * len(frames)
+        if not valid:
+            return out
+
+        batch = self._torch.stack([self._preprocess(images[i]) for i in valid])
+        for i, pred in zip(valid, self._classify_tensor(batch)):
+            out[i] = pred
+        return out
 
-    def predict_shot(self, frame: Any) -> Optional[dict[str, Any]]:
+    def _classify_tensor(self, batch: Any) -> list[tuple[str, float]]:
+        torch = self._torch
+        model = self._model
+        with stage("cnn_inference"), torch.inference_mode():
+            batch = batch.to(self._device)
+            if self._channels_last:
+                batch = batch.contiguous(memory_format=torch.channels_last)
+            probs = torch.nn.functional.softmax(model(batch), dim=1)
+            confs, idxs = probs.max(dim=1)
+        return [
+            (self._class_mapping.get(int(idx), "unknown"), float(conf))
+            for idx, conf in zip(idxs.tolist(), confs.tolist())
+        ]
+
+    def _smooth_sequences(
+        self, preds: list[Optional[tuple[str, float]]], lengths: list[int]
+    ) -> list[Optional[dict[str, Any]]]:
+        results: list[Optional[dict[str, Any]]] = [None] * len(lengths)
+        offset = 0
+        for n, length in enumerate(lengths):
+            smoother = self.new_smoother()
+            for pred in preds[offset : offset + length]:
+                if pred is not None:
+                    results[n] = smoother.update(*pred)
+            offset += length
+        return results
+
+    def predict_shot(self, frame: Any, smoother: Optional[ShotSmoother] = None) -> Optional[dict[str, Any]]:
+        """Classify one frame; pass a session's `smoother` to vote over its recent frames."""
         try:
             if not self._ensure_loaded():
                 return None
 
-            img = self._to_pil_image(frame)
-            if img is None:
+            pred = self._classify_batch([frame])[0]
+            if pred is None:
+                return None
+            return (smoother or self.new_smoother()).update(*pred)
+        except Exception:
+            CNN_ERRORS.inc("inference")
+            return None
+
+    def predict_pose(self, points: np.ndarray, smoother: Optional[ShotSmoother] = None) -> Optional[dict[str, Any]]:
+        """Classify one (17, >=2) pose, e.g. a live frame voted over its session's `smoother`."""
+        try:
+            if not self._ensure_loaded():
                 return None
 
-            tensor = self._preprocess(img).unsqueeze(0).to(self._device)
-            with self._torch.no_grad():
-                logits = self._model(tensor)
-                probs = self._torch.nn.functional.softmax(logits, dim=1)[0]
-                idx = int(self._torch.argmax(probs).item())
-                label = self._class_mapping.get(idx, "unknown")
-                confidence = float(probs[idx].item())
-            return self._smooth(label, confidence)
+            with stage("cnn_render"):
+                batch = self.render_poses(np.asarray(points, dtype=np.float32)[None])
+            pred = self._classify_tensor(self._torch.from_numpy(batch))[0]
+            return (smoother or self.new_smoother()).update(*pred)
         except Exception:
+            CNN_ERRORS.inc("inference")
             return None
 
     def predict_sequence(self, frames: list[Any]) -> Optional[dict[str, Any]]:
-        if not frames:
+        return self.predict_sequences([frames])[0]
+
+    def predict_sequences(self, sequences: list[list[Any]]) -> list[Optional[dict[str, Any]]]:
+        """Classify several frame sequences (e.g. from concurrent requests) in one batched forward pass.
+
+        Each sequence is smoothed independently and returns the vote after its last frame.
+        """
+        flat = [f for seq in sequences for f in seq]
+        if not flat:
+            return [None] * len(sequences)
+
+        try:
+            if not self._ensure_loaded():
+                return [None] * len(sequences)
+            preds = self._classify_batch(flat)
+        except Exception:
+            CNN_ERRORS.inc("inference")
+            return [None] * len(sequences)
+        return self._smooth_sequences(preds, [len(seq) for seq in sequences])
+
+    def predict_pose_sequences(self, sequences: list[np.ndarray]) -> list[Optional[dict[str, Any]]]:
+        """Like `predict_sequences`, but for (n, 17, >=2) keypoint arrays rasterized straight to tensors."""
+        lengths = [len(seq) for seq in sequences]
+        if not sum(lengths):
+            return [None] * len(sequences)
+
+        try:
+            if not self._ensure_loaded():
+                return [None] * len(sequences)
+            points = np.concatenate([np.asarray(seq, dtype=np.float32)[:, :, :2] for seq in sequences])
+            with stage("cnn_render"):
+                batch = self.render_poses(points)
+            preds = self._classify_tensor(self._torch.from_numpy(batch))
+        except Exception:
+            CNN_ERRORS.inc("inference")
+            return [None] * len(sequences)
+        return self._smooth_sequences(preds, lengths)
+
+
+class _PendingSequence:
+    __slots__ = ("points", "done", "result")
+
+    def __init__(self, points: np.ndarray) -> None:
+        self.points = points
+        self.done = threading.Event()
+        self.result: Optional[dict[str, Any]] = None
+
+
+class InferenceBatcher:
+    """Micro-batches pose sequences from concurrent requests into shared forward passes.
+
+    A single worker thread waits for the first queued sequence, then keeps
+    gathering while the next sequence still fits in `max_batch_size` images
+    and `max_wait_ms` has not elapsed, and runs one `predict_pose_sequences`
+    call for all of them. A sequence longer than `max_batch_size` runs alone.
+    """
+
+    def __init__(self, predictor: CricketCNNInference) -> None:
+        self.predictor = predictor
+        self.max_batch_size = max(1, int(os.getenv("CNN_BATCH_MAX_SIZE", "32")))
+        self.max_wait_ms = max(0.0, float(os.getenv("CNN_BATCH_MAX_WAIT_MS", "4")))
+        self.enabled = self.max_wait_ms > 0
+
+        self._queue: queue.SimpleQueue[_PendingSequence] = queue.SimpleQueue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self._batches = 0
+        self._images = 0
+        self._sequences = 0
+        self._max_queue_depth = 0
+        self._batch_sizes: Counter[int] = Counter()
+
+    def submit(self, points: np.ndarray) -> Optional[dict[str, Any]]:
+        if not self.enabled:
+            return self.predictor.predict_pose_sequences([points])[0]
+        if not len(points) or not self.predictor._ensure_loaded():
             return None
-        self.reset()
-        out = None
-        for f in frames:
-            pred = self.predict_shot(f)
-            if pred:
-                out = pred
-        return out
+
+        self._ensure_worker()
+        pending = _PendingSequence(points)
+        self._queue.put(pending)
+        pending.done.wait()
+        return pending.result
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                worker = threading.Thread(target=self._run, name="cnn-batcher", daemon=True)
+                worker.start()
+                self._worker = worker
+
+    def _run(self) -> None:
+        carried: Optional[_PendingSequence] = None
+        while True:
+            batch = [carried if carried is not None else self._queue.get()]
+            carried = None
+            n_images = len(batch[0].points)
+            deadline = time.monotonic() + self.max_wait_ms / 1000.0
+            self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize() + 1)
+
+            while n_images < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if n_images + len(item.points) > self.max_batch_size:
+                    # Does not fit: it opens the next batch instead.
+                    carried = item
+                    break
+                batch.append(item)
+                n_images += len(item.points)
+
+            try:
+                results = self.predictor.predict_pose_sequences([p.points for p in batch])
+            except Exception:
+                CNN_ERRORS.inc("inference")
+                results = [None] * len(batch)
+
+            self._batches += 1
+            self._images += n_images
+            self._sequences += len(batch)
+            self._batch_sizes[n_images] += 1
+            for pending, result in zip(batch, results):
+                pending.result = result
+                pending.done.set()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self._max_queue_depth,
+            "batches": self._batches,
+            "sequences": self._sequences,
+            "images": self._images,
+            "mean_batch_size": round(self._images / self._batches, 3) if self._batches else 0.0,
+            "batch_size_counts": {str(k): v for k, v in sorted(self._batch_sizes.items())},
+        }
 
 
 _GLOBAL_PREDICTOR = CricketCNNInference()
+_GLOBAL_BATCHER = InferenceBatcher(_GLOBAL_PREDICTOR)
 
 
 def get_cnn_predictor() -> CricketCNNInference:
     return _GLOBAL_PREDICTOR
 
 
+def get_cnn_batcher() -> InferenceBatcher:
+    return _GLOBAL_BATCHER
+
+
 def render_pose_to_image(frame: FramePose, image_size: int = 224):
     """Render normalized 17-keypoint pose to an RGB image for optional CNN helper inference."""
     try:
@@ -220,7 +620,7 @@ def render_pose_to_image(frame: FramePose, image_size: int = 224):
     except Exception:
         return None
 
-    canvas = Image.new("RGB", (image_size, image_size), color=(10, 14, 20))
+    canvas = Image.new("RGB", (image_size, image_size), color=_BACKGROUND_RGB)
     draw = ImageDraw.Draw(canvas)
     pts: list[tuple[float, float]] = []
     for kp in frame.keypoints:
@@ -231,10 +631,10 @@ def render_pose_to_image(frame: FramePose, image_size: int = 224):
     for a, b in _SKELETON_EDGES:
         ax, ay = pts[a]
         bx, by = pts[b]
-        draw.line((ax, ay, bx, by), fill=(80, 190, 255), width=2)
+        draw.line((ax, ay, bx, by), fill=_EDGE_RGB, width=2)
 
     for x, y in pts:
-        draw.ellipse((x - 2, y - 2, x + 2, y + 2), fill=(0, 255, 157))
+        draw.ellipse((x - 2, y - 2, x + 2, y + 2), fill=_JOINT_RGB)
 
     return canvas
 
@@ -243,11 +643,13 @@ def predict_from_pose_frames(frames: list[FramePose], stride: int = 3, max_frame
     if not frames:
         return None
 
-    predictor = get_cnn_predictor()
     sampled = frames[:: max(1, stride)][:max_frames]
-    rendered = [render_pose_to_image(f) for f in sampled]
-    rendered = [img for img in rendered if img is not None]
-    if not rendered:
+    return get_cnn_batcher().submit(np.array([[(kp.x, kp.y) for kp in f.keypoints] for f in sampled], dtype=np.float32))
+
+
+def predict_from_pose_array(points: Any, stride: int = 3, max_frames: int = 7) -> Optional[dict[str, Any]]:
+    """Same as predict_from_pose_frames for a packed (T, 17, >=2) keypoint array."""
+    if points is None or len(points) == 0:
         return None
 
-    return predictor.predict_sequence(rendered)
+    return get_cnn_batcher().submit(points[:: max(1, stride)][:max_frames, :, :2])
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+from app.metrics import CNN_ERRORS, stage
+
+
+def resample_sequence(points: np.ndarray, length: int) -> np.ndarray:
+    """Linearly resample a (T, 17, 3) keypoint sequence to (length, 17, 3).
+
+    Also used by `ml/train_cricket_cnn.py`, so training clips match inference.
+    """
+    n = len(points)
+    src = np.linspace(0.0, n - 1, length)
+    lo = np.floor(src).astype(np.intp)
+    hi = np.minimum(lo + 1, n - 1)
+    w = (src - lo)[:, None, None]
+    return (points[lo] * (1.0 - w) + points[hi] * w).astype(np.float32)
+
+
+class CricketPoseInference:
+    """Temporal shot classifier that reads keypoint sequences directly.
+
+    Loads the TorchScript module exported by `train_cricket_cnn.py --mode pose`.
+    Joint normalization lives inside the exported module, so inference here is
+    one resample plus a single forward pass over a (1, L, 17, 3) tensor.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = os.getenv("CNN_SHOT_ENABLED", "1").lower() not in {"0", "false", "no"}
+        self.model_dir = Path(os.getenv("CNN_MODEL_DIR", "backend/models"))
+        self.model_path = self.model_dir / "cricket_pose_model.pt"
+        self.config_path = self.model_dir / "pose_model_config.json"
+
+        self._lock = threading.Lock()
+        self._load_attempted = False
+        self._load_error: Optional[str] = None
+        self._load_ms: Optional[float] = None
+        self._warmup_ms: Optional[float] = None
+
+        self._torch = None
+        self._model = None
+        self._seq_len = 32
+        self._class_mapping: dict[int, str] = {}
+
+    def available(self) -> bool:
+        """Cheap check used for backend selection; does not import torch."""
+        return self.enabled and self.model_path.exists() and self.config_path.exists()
+
+    def _ensure_loaded(self) -> bool:
+        # Hot path: `_load_attempted` is set only after the load outcome is in
+        # `_model`, and neither changes again, so once it reads true no lock is needed.
+        if self._load_attempted:
+            return self._model is not None
+        if not self.available():
+            return False
+
+        with self._lock:
+            if self._load_attempted:
+                return self._model is not None
+
+            start = time.perf_counter()
+            try:
+                with stage("pose_model_load"):
+                    import torch  # type: ignore
+
+                    cfg = json.loads(self.config_path.read_text())
+                    self._seq_len = int(cfg.get("seq_len", self._seq_len))
+                    self._class_mapping = {int(k): str(v) for k, v in cfg["classes"].items()}
+                    self._torch = torch
+                    model = torch.jit.load(str(self.model_path), map_location="cpu")
+                    model.eval()
+                    self._model = model
+            except Exception as exc:
+                CNN_ERRORS.inc("pose_load")
+                self._load_error = str(exc)
+                self._model = None
+            finally:
+                self._load_ms = round((time.perf_counter() - start) * 1000.0, 1)
+                self._load_attempted = True
+        return self._model is not None
+
+    def warm_up(self) -> bool:
+        """Load the module and run one dummy clip through it (TorchScript optimizes on its first calls)."""
+        if not self._ensure_loaded():
+            return False
+        start = time.perf_counter()
+        if self.predict(np.full((self._seq_len, 17, 3), 0.5, dtype=np.float32)) is None:
+            self._load_error = "warm-up inference failed"
+            return False
+        self._warmup_ms = round((time.perf_counter() - start) * 1000.0, 1)
+        return True
+
+    def status(self) -> dict[str, Any]:
+        if not self.available():
+            state = "unavailable"
+        elif self._model is not None:
+            state = "ready" if self._warmup_ms is not None else "loaded"
+        else:
+            state = "failed" if self._load_attempted else "not_loaded"
+        return {
+            "state": state,
+            "load_error": self._load_error,
+            "load_ms": self._load_ms,
+            "warmup_ms": self._warmup_ms,
+        }
+
+    def predict(self, points: np.ndarray) -> Optional[dict[str, Any]]:
+        """Classify a (T, 17, 3) keypoint sequence."""
+        try:
+            if len(points) < 2 or not self._ensure_loaded():
+                return None
+
+            torch = self._torch
+            clip = resample_sequence(np.asarray(points, dtype=np.float32), self._seq_len)
+            with stage("pose_model_inference"), torch.inference_mode():
+                probs = torch.softmax(self._model(torch.from_numpy(clip)[None]), dim=1)[0]
+                conf, idx = probs.max(dim=0)
+            return {
+                "label": self._class_mapping.get(int(idx), "unknown"),
+                "confidence": round(float(conf), 4),
+                "source": "pose",
+            }
+        except Exception:
+            CNN_ERRORS.inc("pose_inference")
+            return None
+
+
+_GLOBAL_POSE_PREDICTOR = CricketPoseInference()
+
+
+def get_pose_predictor() -> CricketPoseInference:
+    return _GLOBAL_POSE_PREDICTOR
+
+
+def predict_from_pose_sequence(points: np.ndarray) -> Optional[dict[str, Any]]:
+    if points is None or len(points) == 0:
+        return None
+    return get_pose_predictor().predict(points)
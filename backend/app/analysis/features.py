@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import statistics
 
-from app.analysis.angles import joint_angle, midpoint
+import numpy as np
+
+from app.analysis.kinematics import frames_to_array, series_from_array
 from app.schemas import FramePose, LiveDataPoint
 
 
@@ -14,51 +16,13 @@ def _argmin(values: list[float]) -> int:
     return min(range(len(values)), key=lambda i: values[i])
 
 
-def _derivative(values: list[float], timestamps: list[float]) -> list[float]:
-    if len(values) != len(timestamps):
-        return [0.0 for _ in values]
-
-    out: list[float] = [0.0]
-    for i in range(1, len(values)):
-        dt = max(timestamps[i] - timestamps[i - 1], 1e-6)
-        out.append((values[i] - values[i - 1]) / dt)
-    return out
+def series_to_lists(series: dict[str, np.ndarray]) -> dict[str, list[float]]:
+    return {k: v.tolist() for k, v in series.items()}
 
 
 def extract_common_series(frames: list[FramePose]) -> dict[str, list[float]]:
-    timestamps = [f.timestamp for f in frames]
-    left_knee = [joint_angle(f, "left_hip", "left_knee", "left_ankle") for f in frames]
-    right_knee = [joint_angle(f, "right_hip", "right_knee", "right_ankle") for f in frames]
-    trunk = [joint_angle(f, "left_shoulder", "left_hip", "left_knee") for f in frames]
-    nose_x = [f.keypoints[0].x for f in frames]
-    hip_y = [midpoint(f, "left_hip", "right_hip")[1] for f in frames]
-    hip_x = [midpoint(f, "left_hip", "right_hip")[0] for f in frames]
-    wrist_x = [midpoint(f, "left_wrist", "right_wrist")[0] for f in frames]
-    wrist_y = [midpoint(f, "left_wrist", "right_wrist")[1] for f in frames]
-    shoulder_y = [midpoint(f, "left_shoulder", "right_shoulder")[1] for f in frames]
-    left_elbow = [joint_angle(f, "left_shoulder", "left_elbow", "left_wrist") for f in frames]
-    right_elbow = [joint_angle(f, "right_shoulder", "right_elbow", "right_wrist") for f in frames]
-
-    hip_velocity = _derivative(hip_y, timestamps)
-    hip_acceleration = _derivative(hip_velocity, timestamps)
-
-    return {
-        "timestamps": timestamps,
-        "left_knee": left_knee,
-        "right_knee": right_knee,
-        "avg_knee": [(l + r) / 2.0 for l, r in zip(left_knee, right_knee)],
-        "trunk": trunk,
-        "nose_x": nose_x,
-        "hip_y": hip_y,
-        "hip_x": hip_x,
-        "wrist_x": wrist_x,
-        "wrist_y": wrist_y,
-        "shoulder_y": shoulder_y,
-        "left_elbow": left_elbow,
-        "right_elbow": right_elbow,
-        "hip_velocity": hip_velocity,
-        "hip_acceleration": hip_acceleration,
-    }
+    points, timestamps = frames_to_array(frames)
+    return series_to_lists(series_from_array(points, timestamps))
 
 
 def kinematics_stream(series: dict[str, list[float]]) -> list[LiveDataPoint]:
@@ -144,3 +108,13 @@ def bowling_features_from_series(s: dict[str, list[float]]) -> dict[str, float]:
         "hip_drive_velocity_span": hip_drive,
         "release_timing_index": release_delay,
     }
+
+
+def activity_features_from_series(activity: str, s: dict[str, list[float]], fps: float) -> dict[str, float]:
+    if activity == "squat":
+        return squat_features_from_series(s)
+    if activity == "cricket_cover_drive":
+        return cover_drive_features_from_series(s, fps)
+    if activity == "pushup":
+        return pushup_features_from_series(s)
+    return bowling_features_from_series(s)
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
+import math
 import os
-from typing import Any
+import re
+import uuid
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Awaitable, Optional
 
-from openai import OpenAI
-
-from app.analysis.reference_library import REFERENCE_LIBRARY
+from app.analysis.reference_library import current_reference
+from app.cache import SqliteStore, TTLCache
 from app.schemas import BiomechanicsSummary, MetricResult
 
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
 
 SYSTEM_PROMPT = """
 You are a biomechanics coaching assistant.
@@ -20,9 +28,29 @@ Rules:
 - Max 5 bullets.
 """.strip()
 
+# Hard budget for the rewrite; past it, the deterministic findings are returned.
+LLM_TIMEOUT_S = float(os.getenv("OPENAI_TIMEOUT_S", "2.0"))
+
+_CLIENT: Optional["AsyncOpenAI"] = None
+
+# Rewrites are cached by activity + failing metrics, with each value bucketed to
+# a fraction of its target width so near-identical findings share one LLM call.
+# The bucketing only shapes the key: the prompt carries the measured values.
+LLM_CACHE_BUCKET = float(os.getenv("LLM_CACHE_BUCKET", "0.25"))
+_LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "")
+_LLM_CACHE_TTL_S = float(os.getenv("LLM_CACHE_TTL_S", "86400"))
+_LLM_CACHE_MAX_ROWS = int(os.getenv("LLM_CACHE_MAX_ROWS", "20000"))
+LLM_CACHE = TTLCache(
+    max_entries=int(os.getenv("LLM_CACHE_SIZE", "2048")),
+    ttl_s=_LLM_CACHE_TTL_S,
+    store=SqliteStore(_LLM_CACHE_PATH, "llm_feedback", _LLM_CACHE_TTL_S, _LLM_CACHE_MAX_ROWS) if _LLM_CACHE_PATH else None,
+)
+_INFLIGHT: dict[str, asyncio.Future[list[str]]] = {}
+_LLM_STATS = {"calls": 0, "failures": 0, "timeouts": 0, "coalesced": 0, "fallbacks": 0, "uncached": 0}
+
 
 def deterministic_feedback(activity: str, metrics: list[MetricResult]) -> list[str]:
-    messages = REFERENCE_LIBRARY[activity]["messages"]
+    messages = current_reference().library[activity]["messages"]
     findings: list[str] = []
     for m in metrics:
         if m.score >= 85:
@@ -121,41 +149,172 @@ def performance_explanations(activity: str, metrics: list[MetricResult], bio: Bi
     return out[:4]
 
 
-def maybe_rewrite_with_llm(
+def llm_enabled() -> bool:
+    return bool(os.getenv("OPENAI_API_KEY"))
+
+
+def _get_client() -> "AsyncOpenAI":
+    # One shared client keeps its HTTP connection pool across requests. The SDK
+    # is imported here so workers without an API key never load it.
+    global _CLIENT
+    if _CLIENT is None:
+        from openai import AsyncOpenAI
+
+        _CLIENT = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=LLM_TIMEOUT_S, max_retries=0)
+    return _CLIENT
+
+
+def _failing_buckets(metrics: list[MetricResult]) -> list[tuple[str, int, float, float]]:
+    out = []
+    for m in metrics:
+        if m.score >= 85:
+            continue
+        step = max(m.target_max - m.target_min, 1e-6) * LLM_CACHE_BUCKET
+        out.append((m.name, math.floor(m.value / step), m.target_min, m.target_max))
+    return sorted(out)
+
+
+def feedback_cache_key(activity: str, metrics: list[MetricResult], model: str) -> str:
+    raw = json.dumps([activity, model, SYSTEM_PROMPT, current_reference().version, _failing_buckets(metrics)])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+# A rewrite that quotes numbers was written for one request's measurements; only
+# number-free wording is safe to hand to other requests that share its bucket.
+_HAS_NUMBER = re.compile(r"\d")
+
+
+def _shareable(rewritten: list[str]) -> bool:
+    return bool(rewritten) and not any(_HAS_NUMBER.search(line) for line in rewritten)
+
+
+async def maybe_rewrite_with_llm(
     activity: str,
     findings: list[str],
     metrics: list[MetricResult],
     biomechanics: BiomechanicsSummary,
 ) -> list[str]:
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    """Rewrite findings with the LLM, returning them unchanged if it is off, fails or exceeds the budget.
+
+    The LLM always sees the request's own measurements. Rewrites without numbers are cached (and
+    shared with concurrent requests) under the bucketed failing-metric key; its SQLite tier is
+    read and written off the event loop.
+    """
+    if not llm_enabled():
         return findings
 
     model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-    client = OpenAI(api_key=api_key)
+    key = feedback_cache_key(activity, metrics, model)
+    cached = await LLM_CACHE.aget(key)
+    if cached is not None:
+        return list(cached)
+
+    inflight = _INFLIGHT.get(key)
+    if inflight is not None:
+        shared = await asyncio.shield(inflight)
+        if shared is not None:
+            _LLM_STATS["coalesced"] += 1
+            if not shared:
+                _LLM_STATS["fallbacks"] += 1
+            return list(shared) or findings
+        # The leader's rewrite quoted its own numbers; ask for ours.
+        return await _rewrite(model, activity, findings, metrics, biomechanics)
 
+    # Resolves to the shareable rewrite, [] when the call failed, or None when
+    # the rewrite is specific to this request.
+    future: asyncio.Future[Optional[list[str]]] = asyncio.get_running_loop().create_future()
+    _INFLIGHT[key] = future
+    try:
+        rewritten = await _rewrite(model, activity, findings, metrics, biomechanics)
+        shareable = _shareable(rewritten)
+        future.set_result(rewritten if shareable or not rewritten else None)
+        if shareable:
+            await LLM_CACHE.aset(key, rewritten)
+        return rewritten or findings
+    finally:
+        if not future.done():
+            future.set_result([])
+        _INFLIGHT.pop(key, None)
+
+
+async def _rewrite(
+    model: str,
+    activity: str,
+    findings: list[str],
+    metrics: list[MetricResult],
+    biomechanics: BiomechanicsSummary,
+) -> list[str]:
+    rewritten = await _call_llm(model, activity, findings, metrics, biomechanics)
+    if not rewritten:
+        _LLM_STATS["fallbacks"] += 1
+    elif not _shareable(rewritten):
+        _LLM_STATS["uncached"] += 1
+    return rewritten
+
+
+async def _call_llm(
+    model: str,
+    activity: str,
+    findings: list[str],
+    metrics: list[MetricResult],
+    biomechanics: BiomechanicsSummary,
+) -> list[str]:
     payload: dict[str, Any] = {
         "activity": activity,
         "metrics": [m.model_dump() for m in metrics],
         "biomechanics": biomechanics.model_dump(),
         "findings": findings,
     }
-
+    _LLM_STATS["calls"] += 1
     try:
-        resp = client.responses.create(
-            model=model,
-            input=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {
-                    "role": "user",
-                    "content": f"Rewrite these coaching findings as bullets:\n{json.dumps(payload)}",
-                },
-            ],
-            max_output_tokens=260,
-            temperature=0.2,
+        resp = await asyncio.wait_for(
+            _get_client().responses.create(
+                model=model,
+                input=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {
+                        "role": "user",
+                        "content": f"Rewrite these coaching findings as bullets:\n{json.dumps(payload)}",
+                    },
+                ],
+                max_output_tokens=260,
+                temperature=0.2,
+            ),
+            timeout=LLM_TIMEOUT_S,
         )
         text = (resp.output_text or "").strip()
         rewritten = [line.strip("- ").strip() for line in text.splitlines() if line.strip()]
-        return rewritten[:5] if rewritten else findings
+        return rewritten[:5]
+    except asyncio.TimeoutError:
+        _LLM_STATS["timeouts"] += 1
+        return []
     except Exception:
-        return findings
+        _LLM_STATS["failures"] += 1
+        return []
+
+
+def llm_stats() -> dict[str, Any]:
+    return {**_LLM_STATS, "cache": LLM_CACHE.stats()}
+
+
+class DeferredFeedback:
+    """Bounded store of background LLM rewrites, polled via the follow-up endpoint."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._tasks: OrderedDict[str, asyncio.Task[list[str]]] = OrderedDict()
+
+    def submit(self, rewrite: Awaitable[list[str]]) -> str:
+        feedback_id = uuid.uuid4().hex
+        self._tasks[feedback_id] = asyncio.ensure_future(rewrite)
+        while len(self._tasks) > self.max_entries:
+            self._tasks.popitem(last=False)
+        return feedback_id
+
+    def get(self, feedback_id: str) -> Optional[tuple[str, Optional[list[str]]]]:
+        task = self._tasks.get(feedback_id)
+        if task is None:
+            return None
+        if not task.done():
+            return "pending", None
+        return "final", task.result()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.analysis.constants import KEYPOINT_INDEX
+from app.schemas import FramePose
+
+
+def frames_to_array(frames: list[FramePose]) -> tuple[np.ndarray, np.ndarray]:
+    """Pack frames into a (T, 17, 3) float array of x/y/score plus a (T,) timestamp vector."""
+    points = np.array(
+        [[(kp.x, kp.y, kp.score) for kp in f.keypoints] for f in frames],
+        dtype=np.float64,
+    ).reshape(len(frames), len(KEYPOINT_INDEX), 3)
+    timestamps = np.array([f.timestamp for f in frames], dtype=np.float64)
+    return points, timestamps
+
+
+def _xy(points: np.ndarray, name: str) -> np.ndarray:
+    return points[:, KEYPOINT_INDEX[name], :2]
+
+
+def joint_angles(points: np.ndarray, a_name: str, b_name: str, c_name: str) -> np.ndarray:
+    b = _xy(points, b_name)
+    ab = _xy(points, a_name) - b
+    cb = _xy(points, c_name) - b
+    dot = np.einsum("ij,ij->i", ab, cb)
+    mag_ab = np.hypot(ab[:, 0], ab[:, 1])
+    mag_cb = np.hypot(cb[:, 0], cb[:, 1])
+    degenerate = (mag_ab == 0) | (mag_cb == 0)
+    denom = np.where(degenerate, 1.0, mag_ab * mag_cb)
+    # fmin/fmax clamp like Python's min/max did in the scalar path: a NaN cosine becomes 1.0 (0 degrees).
+    cosine = np.fmax(-1.0, np.fmin(dot / denom, 1.0))
+    return np.where(degenerate, 180.0, np.degrees(np.arccos(cosine)))
+
+
+def midpoints(points: np.ndarray, left_name: str, right_name: str) -> np.ndarray:
+    return (_xy(points, left_name) + _xy(points, right_name)) / 2.0
+
+
+def derivative(values: np.ndarray, timestamps: np.ndarray) -> np.ndarray:
+    if values.shape != timestamps.shape:
+        return np.zeros_like(values)
+
+    out = np.zeros_like(values)
+    if values.size > 1:
+        dt = np.maximum(np.diff(timestamps), 1e-6)
+        out[1:] = np.diff(values) / dt
+    return out
+
+
+def series_from_array(points: np.ndarray, timestamps: np.ndarray) -> dict[str, np.ndarray]:
+    left_knee = joint_angles(points, "left_hip", "left_knee", "left_ankle")
+    right_knee = joint_angles(points, "right_hip", "right_knee", "right_ankle")
+    hip = midpoints(points, "left_hip", "right_hip")
+    wrist = midpoints(points, "left_wrist", "right_wrist")
+    shoulder = midpoints(points, "left_shoulder", "right_shoulder")
+    hip_y = hip[:, 1]
+    hip_velocity = derivative(hip_y, timestamps)
+
+    return {
+        "timestamps": timestamps,
+        "left_knee": left_knee,
+        "right_knee": right_knee,
+        "avg_knee": (left_knee + right_knee) / 2.0,
+        "trunk": joint_angles(points, "left_shoulder", "left_hip", "left_knee"),
+        "nose_x": points[:, KEYPOINT_INDEX["nose"], 0],
+        "hip_y": hip_y,
+        "hip_x": hip[:, 0],
+        "wrist_x": wrist[:, 0],
+        "wrist_y": wrist[:, 1],
+        "shoulder_y": shoulder[:, 1],
+        "left_elbow": joint_angles(points, "left_shoulder", "left_elbow", "left_wrist"),
+        "right_elbow": joint_angles(points, "right_shoulder", "right_elbow", "right_wrist"),
+        "hip_velocity": hip_velocity,
+        "hip_acceleration": derivative(hip_velocity, timestamps),
+    }
@@ -1,5 +1,21 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+from app.metrics import REFERENCE_RELOADS
+
+# Built-in targets, weights and messages. With REFERENCE_LIBRARY_PATH set, the
+# library is read from that JSON file instead (same shape, ranges as [lo, hi])
+# and reloaded in the background when the file changes. Each load is an
+# immutable snapshot tagged with a content-hash version; requests pin one
+# snapshot up front, so a reload never mixes two versions in one response.
 REFERENCE_LIBRARY = {
     "squat": {
         "weights": {
@@ -88,3 +104,177 @@ REFERENCE_LIBRARY = {
         },
     },
 }
+
+REFERENCE_LIBRARY_PATH = os.getenv("REFERENCE_LIBRARY_PATH", "")
+# How often workers check the file for changes; 0 disables background reloads.
+REFERENCE_RELOAD_INTERVAL_S = float(os.getenv("REFERENCE_RELOAD_INTERVAL_S", "5"))
+
+
+class ReferenceSnapshot(NamedTuple):
+    version: str
+    library: dict[str, Any]
+    source: str
+    loaded_at: float
+
+
+def library_version(library: dict[str, Any]) -> str:
+    """Content hash of a library; cached results are keyed on it, so edits never serve stale scores."""
+    return hashlib.sha256(json.dumps(library, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def _mapping(value: Any, where: str) -> dict[str, Any]:
+    if not isinstance(value, dict):
+        raise ValueError(f"{where}: expected an object, got {type(value).__name__}")
+    return value
+
+
+def _number(value: Any, where: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{where}: expected a number, got {type(value).__name__}")
+    return float(value)
+
+
+def validate_library(library: Any) -> dict[str, Any]:
+    """Check a loaded library against the built-in metric set; returns it with ranges as tuples.
+
+    Every problem is a ValueError naming the offending field, e.g. `squat.targets.depth_ratio`.
+    """
+    library = _mapping(library, "library")
+    if set(library) != set(REFERENCE_LIBRARY):
+        raise ValueError(f"library: expected activities {sorted(REFERENCE_LIBRARY)}, got {sorted(library)}")
+    out = {}
+    for activity, builtin in REFERENCE_LIBRARY.items():
+        ref = _mapping(library[activity], activity)
+        metrics = set(builtin["targets"])
+        sections = {section: _mapping(ref.get(section), f"{activity}.{section}") for section in ("targets", "weights", "messages")}
+        for section in ("targets", "weights"):
+            if set(sections[section]) != metrics:
+                raise ValueError(f"{activity}.{section}: must cover exactly {sorted(metrics)}")
+        if not metrics <= set(sections["messages"]):
+            raise ValueError(f"{activity}.messages: missing {sorted(metrics - set(sections['messages']))}")
+
+        targets = {}
+        for name, bounds in sections["targets"].items():
+            where = f"{activity}.targets.{name}"
+            if not isinstance(bounds, (list, tuple)) or len(bounds) != 2:
+                raise ValueError(f"{where}: expected [min, max]")
+            lo, hi = _number(bounds[0], where), _number(bounds[1], where)
+            if not lo <= hi:
+                raise ValueError(f"{where}: target min {lo} exceeds max {hi}")
+            targets[name] = (lo, hi)
+        weights = {name: _number(w, f"{activity}.weights.{name}") for name, w in sections["weights"].items()}
+        if min(weights.values()) < 0 or sum(weights.values()) <= 0:
+            raise ValueError(f"{activity}.weights: must be non-negative with a positive sum")
+        messages = {}
+        for name, message in sections["messages"].items():
+            if not isinstance(message, str):
+                raise ValueError(f"{activity}.messages.{name}: expected a string, got {type(message).__name__}")
+            messages[name] = message
+        out[activity] = {"weights": weights, "targets": targets, "messages": messages}
+    return out
+
+
+def load_reference(path: Path) -> ReferenceSnapshot:
+    library = validate_library(json.loads(path.read_text(encoding="utf-8")))
+    return ReferenceSnapshot(library_version(library), library, str(path), time.time())
+
+
+def _file_stat(path: Path) -> tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+_RELOAD_LOCK = threading.Lock()
+_RELOAD_STATE: dict[str, Any] = {"file_stat": None, "last_error": None, "watcher": False}
+
+
+def _initial_snapshot() -> ReferenceSnapshot:
+    # A configured file that cannot be loaded fails startup rather than silently serving the built-in library.
+    if not REFERENCE_LIBRARY_PATH:
+        return ReferenceSnapshot(library_version(REFERENCE_LIBRARY), REFERENCE_LIBRARY, "builtin", time.time())
+    path = Path(REFERENCE_LIBRARY_PATH)
+    _RELOAD_STATE["file_stat"] = _file_stat(path)
+    return load_reference(path)
+
+
+_CURRENT = _initial_snapshot()
+_PINNED: ContextVar[Optional[ReferenceSnapshot]] = ContextVar("reference_snapshot", default=None)
+
+
+def current_reference() -> ReferenceSnapshot:
+    """The snapshot pinned for this request, else the latest loaded one."""
+    return _PINNED.get() or _CURRENT
+
+
+def pin_reference() -> ReferenceSnapshot:
+    """Pin the latest snapshot for the rest of this context (a request, or the threads it hands work to)."""
+    snapshot = _CURRENT
+    _PINNED.set(snapshot)
+    return snapshot
+
+
+def _record_failure(exc: Exception) -> None:
+    _RELOAD_STATE["last_error"] = f"{type(exc).__name__}: {exc}"
+    REFERENCE_RELOADS.inc("failed")
+
+
+def reload_reference(force: bool = False) -> bool:
+    """Swap in the file's library if it changed; returns whether a new version was installed.
+
+    A file that fails to parse or validate leaves the current snapshot in
+    place and is retried once it changes again, so editors should still write
+    to a temporary file and rename it over the old one.
+    """
+    global _CURRENT
+    if not REFERENCE_LIBRARY_PATH:
+        return False
+    path = Path(REFERENCE_LIBRARY_PATH)
+    with _RELOAD_LOCK:
+        try:
+            stat = _file_stat(path)
+            if not force and stat == _RELOAD_STATE["file_stat"]:
+                return False
+            _RELOAD_STATE["file_stat"] = stat
+            snapshot = load_reference(path)
+        except (OSError, ValueError) as exc:
+            _record_failure(exc)
+            return False
+        _RELOAD_STATE["last_error"] = None
+        if snapshot.version == _CURRENT.version:
+            REFERENCE_RELOADS.inc("unchanged")
+            return False
+        _CURRENT = snapshot
+        REFERENCE_RELOADS.inc("reloaded")
+        return True
+
+
+def _watch(interval_s: float) -> None:
+    while True:
+        time.sleep(interval_s)
+        try:
+            reload_reference()
+        except Exception as exc:  # an unexpected failure must not stop later reloads
+            _record_failure(exc)
+
+
+def start_reference_watcher() -> None:
+    """Poll REFERENCE_LIBRARY_PATH in a daemon thread; a no-op without a file or when already running."""
+    if not REFERENCE_LIBRARY_PATH or REFERENCE_RELOAD_INTERVAL_S <= 0:
+        return
+    with _RELOAD_LOCK:
+        if _RELOAD_STATE["watcher"]:
+            return
+        _RELOAD_STATE["watcher"] = True
+    threading.Thread(target=_watch, args=(REFERENCE_RELOAD_INTERVAL_S,), name="reference-watcher", daemon=True).start()
+
+
+def reference_status() -> dict[str, Any]:
+    snapshot = _CURRENT
+    return {
+        "version": snapshot.version,
+        "source": snapshot.source,
+        "loaded_at": snapshot.loaded_at,
+        "reload_interval_s": REFERENCE_RELOAD_INTERVAL_S if REFERENCE_LIBRARY_PATH else None,
+        "watching": _RELOAD_STATE["watcher"],
+        "last_error": _RELOAD_STATE["last_error"],
+    }
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import statistics
+from typing import Optional
+
+import numpy as np
+
+from app.analysis.features import activity_features_from_series
+from app.analysis.scoring import score_feature_rows
+from app.schemas import RepResult, RepSummary
+
+REP_ACTIVITIES = {"squat", "pushup"}
+
+
+def rep_signal(activity: str, series: dict[str, list[float]]) -> Optional[list[float]]:
+    """Signal whose peaks are the bottom of each rep (hips lowest / elbows most bent)."""
+    if activity == "squat":
+        return series["hip_y"]
+    if activity == "pushup":
+        return [-(l + r) / 2.0 for l, r in zip(series["left_elbow"], series["right_elbow"])]
+    return None
+
+
+def segment_reps(
+    signal: list[float],
+    hysteresis: float = 0.3,
+    min_frames: int = 5,
+) -> list[tuple[int, int]]:
+    """Split a signal into (start, end) frame ranges, one per completed rep, in a single pass.
+
+    A rep starts at a trough, must rise by more than `hysteresis` times the
+    signal's 5-95 percentile range to reach its peak, and is complete once it
+    falls back by the same band; it ends at the trough before the next rep.
+    """
+    n = len(signal)
+    if n < 2:
+        return []
+    lo, hi = np.percentile(signal, [5.0, 95.0])
+    band = hysteresis * float(hi - lo)
+    if band <= 0:
+        return []
+
+    reps: list[tuple[int, int]] = []
+    trough_idx = 0
+    peak_idx = 0
+    start_idx: Optional[int] = None
+    descending = False  # True between a rep's trough-exit and its peak-exit
+    for i in range(1, n):
+        v = signal[i]
+        if descending:
+            if v > signal[peak_idx]:
+                peak_idx = i
+            elif v < signal[peak_idx] - band:
+                descending = False
+                trough_idx = i
+            continue
+
+        if v < signal[trough_idx]:
+            trough_idx = i
+        elif v > signal[trough_idx] + band:
+            if start_idx is not None:
+                reps.append((start_idx, trough_idx))
+            start_idx = trough_idx
+            peak_idx = i
+            descending = True
+
+    if start_idx is not None and not descending:
+        reps.append((start_idx, trough_idx))
+    return [(s, e) for s, e in reps if e - s + 1 >= min_frames]
+
+
+def rep_summary(activity: str, series: dict[str, list[float]], fps: float) -> Optional[RepSummary]:
+    signal = rep_signal(activity, series)
+    if signal is None:
+        return None
+
+    bounds = segment_reps(signal)
+    features = [
+        activity_features_from_series(activity, {k: v[start : end + 1] for k, v in series.items()}, fps)
+        for start, end in bounds
+    ]
+    reps: list[RepResult] = []
+    for n, ((start, end), (overall, metrics)) in enumerate(zip(bounds, score_feature_rows(activity, features))):
+        t0, t1 = series["timestamps"][start], series["timestamps"][end]
+        reps.append(
+            RepResult(
+                index=n,
+                start_frame=start,
+                end_frame=end,
+                start_time=round(t0, 3),
+                end_time=round(t1, 3),
+                duration_s=round(t1 - t0, 3),
+                overall_score=overall,
+                metrics=metrics,
+            )
+        )
+
+    if not reps:
+        return RepSummary(count=0)
+
+    scores = [r.overall_score for r in reps]
+    durations = [r.duration_s for r in reps]
+    metric_means = {
+        m.name: round(statistics.fmean(r.metrics[i].value for r in reps), 4) for i, m in enumerate(reps[0].metrics)
+    }
+    return RepSummary(
+        count=len(reps),
+        reps=reps,
+        mean_score=round(statistics.fmean(scores), 2),
+        min_score=min(scores),
+        max_score=max(scores),
+        mean_duration_s=round(statistics.fmean(durations), 3),
+        tempo_stdev_s=round(statistics.pstdev(durations), 3),
+        metric_means=metric_means,
+    )
@@ -1,8 +1,70 @@
 from __future__ import annotations
 
-from app.analysis.reference_library import REFERENCE_LIBRARY
+import copy
+from typing import Any, Mapping, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from app.analysis.reference_library import ReferenceSnapshot, current_reference
 from app.schemas import MetricResult
 
+# Each reference library snapshot is compiled once into per-activity arrays so
+# scoring is index lookups and array math; `score_matrix` scores many clips (and many
+# candidate reference sets) in one NumPy pass. MetricResult objects are only
+# built by `score_activity` / `score_feature_rows`, at the response edge.
+
+
+class CompiledReference(NamedTuple):
+    metrics: tuple[str, ...]
+    index: dict[str, int]
+    lo: np.ndarray
+    hi: np.ndarray
+    weights: np.ndarray
+    # (lo, hi, weight) per metric as Python floats for the single-clip path.
+    rows: tuple[tuple[float, float, float], ...]
+
+
+def compile_reference(library: Optional[Mapping[str, Any]] = None) -> dict[str, CompiledReference]:
+    library = current_reference().library if library is None else library
+    compiled = {}
+    for activity, ref in library.items():
+        metrics = tuple(ref["targets"])
+        rows = tuple((float(ref["targets"][m][0]), float(ref["targets"][m][1]), float(ref["weights"][m])) for m in metrics)
+        table = np.array(rows, dtype=np.float64).reshape(len(metrics), 3)
+        compiled[activity] = CompiledReference(
+            metrics=metrics,
+            index={m: i for i, m in enumerate(metrics)},
+            lo=table[:, 0].copy(),
+            hi=table[:, 1].copy(),
+            weights=table[:, 2].copy(),
+            rows=rows,
+        )
+    return compiled
+
+
+# (version, compiled) of the last snapshot scored; replaced whole, so readers never see a partial update.
+_COMPILED: tuple[str, dict[str, CompiledReference]] = ("", {})
+
+
+def compiled_reference(snapshot: Optional[ReferenceSnapshot] = None) -> dict[str, CompiledReference]:
+    """Compiled arrays for `snapshot` (default: the current one), recompiled only when the version changes."""
+    global _COMPILED
+    snapshot = snapshot or current_reference()
+    version, compiled = _COMPILED
+    if version != snapshot.version:
+        compiled = compile_reference(snapshot.library)
+        _COMPILED = (snapshot.version, compiled)
+    return compiled
+
+
+def apply_overrides(overrides: Mapping[str, Any], library: Optional[Mapping[str, Any]] = None) -> dict[str, Any]:
+    """Copy of `library` (default: the current one) with `{activity: {"targets": {...}, "weights": {...}}}` entries replaced."""
+    merged = copy.deepcopy(dict(current_reference().library if library is None else library))
+    for activity, sections in overrides.items():
+        for section, values in sections.items():
+            merged[activity][section].update({k: tuple(v) if isinstance(v, list) else v for k, v in values.items()})
+    return merged
+
 
 def _metric_score(value: float, lo: float, hi: float) -> tuple[float, float]:
     if lo <= value <= hi:
@@ -13,19 +75,52 @@ def _metric_score(value: float, lo: float, hi: float) -> tuple[float, float]:
     return deviation, max(0.0, 100.0 - penalty)
 
 
+def score_matrix(
+    values: np.ndarray, lo: np.ndarray, hi: np.ndarray, weights: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Score an (N, M) feature matrix against one (M,) or R stacked (R, M) reference sets.
+
+    Returns unrounded overall scores (N,) or (R, N) plus per-metric deviations
+    and scores shaped (..., N, M). Matches `score_activity` exactly: the
+    weighted sum runs over metrics in order, as the scalar loop does.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    lo = np.asarray(lo, dtype=np.float64)[..., None, :]
+    hi = np.asarray(hi, dtype=np.float64)[..., None, :]
+    weights = np.asarray(weights, dtype=np.float64)[..., None, :]
+
+    inside = (values >= lo) & (values <= hi)
+    deviation = np.where(inside, 0.0, np.minimum(np.abs(values - lo), np.abs(values - hi)))
+    penalty = (deviation / np.maximum(hi - lo, 1e-6)) * 100.0
+    scores = np.where(inside, 100.0, np.fmax(0.0, 100.0 - penalty))
+
+    shape = np.broadcast_shapes(scores.shape[:-1], weights.shape[:-1])
+    weighted = np.zeros(shape)
+    total = np.zeros(shape)
+    for m in range(values.shape[-1]):
+        weighted = weighted + scores[..., m] * weights[..., m]
+        total = total + weights[..., m]
+    return weighted / np.maximum(total, 1e-6), deviation, scores
+
+
+def stack_references(
+    compiled: Sequence[Mapping[str, CompiledReference]], activity: str, metrics: Optional[Sequence[str]] = None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(R, M) lo/hi/weight arrays for `activity` across candidate libraries, in `metrics` order."""
+    idx = [compiled[0][activity].index[m] for m in (metrics or compiled[0][activity].metrics)]
+    return tuple(np.stack([getattr(c[activity], field)[idx] for c in compiled]) for field in ("lo", "hi", "weights"))
+
+
 def score_activity(activity: str, feature_values: dict[str, float]) -> tuple[float, list[MetricResult]]:
-    ref = REFERENCE_LIBRARY[activity]
-    targets = ref["targets"]
-    weights = ref["weights"]
+    ref = compiled_reference()[activity]
 
     metrics: list[MetricResult] = []
     weighted_sum = 0.0
     total_weight = 0.0
 
     for name, value in feature_values.items():
-        lo, hi = targets[name]
+        lo, hi, weight = ref.rows[ref.index[name]]
         deviation, score = _metric_score(value, lo, hi)
-        weight = weights[name]
         weighted_sum += score * weight
         total_weight += weight
         metrics.append(
@@ -41,3 +136,31 @@ def score_activity(activity: str, feature_values: dict[str, float]) -> tuple[flo
 
     overall = weighted_sum / max(total_weight, 1e-6)
     return round(overall, 2), metrics
+
+
+def score_feature_rows(activity: str, rows: list[dict[str, float]]) -> list[tuple[float, list[MetricResult]]]:
+    """`score_activity` for many feature dicts of one activity, scored in a single `score_matrix` pass."""
+    if not rows:
+        return []
+    ref = compiled_reference()[activity]
+    names = list(rows[0])
+    idx = [ref.index[name] for name in names]
+    lo, hi = ref.lo[idx], ref.hi[idx]
+    values = np.array([[row[name] for name in names] for row in rows], dtype=np.float64)
+    overall, deviation, scores = score_matrix(values, lo, hi, ref.weights[idx])
+
+    out = []
+    for i in range(len(rows)):
+        metrics = [
+            MetricResult(
+                name=name,
+                value=round(float(values[i, j]), 4),
+                target_min=float(lo[j]),
+                target_max=float(hi[j]),
+                deviation=round(float(deviation[i, j]), 4),
+                score=round(float(scores[i, j]), 2),
+            )
+            for j, name in enumerate(names)
+        ]
+        out.append((round(float(overall[i]), 2), metrics))
+    return out
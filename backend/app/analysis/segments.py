@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from app.analysis.activity import activity_segments
+from app.analysis.features import activity_features_from_series
+from app.analysis.reps import rep_summary
+from app.analysis.scoring import score_activity
+from app.metrics import stage
+from app.schemas import ActivitySegment
+
+# Routes every segment of the activity timeline through its own activity's
+# feature, scoring and rep path. The longest segment drives the clip-level
+# fields of the response; the per-segment breakdown is only reported when a
+# clip actually mixes activities.
+
+
+def slice_series(series: dict[str, list[float]], start: int, end: int) -> dict[str, list[float]]:
+    return {k: v[start:end] for k, v in series.items()}
+
+
+def analyze_segments(
+    series: dict[str, list[float]], fps: float, activity_hint: str
+) -> tuple[list[ActivitySegment], int]:
+    """Score each detected segment; returns the segments and the index of the longest one."""
+    with stage("detect_activity"):
+        timeline = activity_segments(series, fps, activity_hint)
+
+    timestamps = series["timestamps"]
+    segments: list[ActivitySegment] = []
+    for activity, start, end in timeline:
+        part = series if len(timeline) == 1 else slice_series(series, start, end)
+        with stage("features"):
+            features = activity_features_from_series(activity, part, fps)
+        with stage("score"):
+            overall, metrics = score_activity(activity, features)
+        with stage("reps"):
+            reps = rep_summary(activity, part, fps)
+        segments.append(
+            ActivitySegment(
+                activity=activity,
+                start_frame=start,
+                end_frame=end,
+                start_s=round(timestamps[start], 3),
+                end_s=round(timestamps[end - 1], 3),
+                overall_score=overall,
+                metrics=metrics,
+                reps=reps,
+            )
+        )
+    longest = max(range(len(segments)), key=lambda i: segments[i].end_frame - segments[i].start_frame)
+    return segments, longest
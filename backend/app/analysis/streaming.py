@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Optional
+
+import numpy as np
+
+from app.analysis.accumulators import ActivityDetectorAccumulator, feature_accumulator
+from app.analysis.activity import ACTIVITIES, classify_activity
+from app.analysis.cricket_cnn_inference import get_cnn_predictor
+from app.analysis.kinematics import series_from_array
+from app.analysis.reference_library import pin_reference
+from app.analysis.scoring import score_activity
+
+SERIES_KEYS = (
+    "timestamps",
+    "left_knee",
+    "right_knee",
+    "avg_knee",
+    "trunk",
+    "nose_x",
+    "hip_y",
+    "hip_x",
+    "wrist_x",
+    "wrist_y",
+    "shoulder_y",
+    "left_elbow",
+    "right_elbow",
+    "hip_velocity",
+    "hip_acceleration",
+)
+
+MIN_FRAMES = 10
+
+
+class StreamingSeries:
+    """Rolling counterpart of `extract_common_series`, updated one frame at a time.
+
+    Per-frame angles and midpoints come from the same vectorized kinematics
+    code; velocity and acceleration carry the previous sample as state, so a
+    push costs the same regardless of how long the session has run.
+    """
+
+    def __init__(self, window: Optional[int] = None) -> None:
+        self.window = window
+        self.series: dict[str, deque[float]] = {k: deque(maxlen=window) for k in SERIES_KEYS}
+        self._prev: Optional[tuple[float, float, float]] = None
+        self.count = 0
+
+    def push(self, points: np.ndarray, timestamp: float) -> dict[str, float]:
+        row = {
+            k: float(v[0])
+            for k, v in series_from_array(np.asarray(points, dtype=np.float64)[None], np.array([timestamp])).items()
+        }
+        if self._prev is None:
+            velocity = acceleration = 0.0
+        else:
+            prev_t, prev_hip_y, prev_velocity = self._prev
+            dt = max(timestamp - prev_t, 1e-6)
+            velocity = (row["hip_y"] - prev_hip_y) / dt
+            acceleration = (velocity - prev_velocity) / dt
+        row["hip_velocity"] = velocity
+        row["hip_acceleration"] = acceleration
+        self._prev = (timestamp, row["hip_y"], velocity)
+
+        for k in SERIES_KEYS:
+            self.series[k].append(row[k])
+        self.count += 1
+        return row
+
+    def as_lists(self) -> dict[str, list[float]]:
+        return {k: list(v) for k, v in self.series.items()}
+
+    def __len__(self) -> int:
+        return len(self.series["timestamps"])
+
+
+class LiveSession:
+    """Per-connection state for the live WebSocket: series buffers, feature accumulators, score and CNN smoothing.
+
+    With `activity_hint="auto"` all four activities are accumulated alongside
+    the detector inputs, so the label can change without rescanning history.
+    """
+
+    def __init__(
+        self,
+        activity_hint: str = "auto",
+        fps: float = 30.0,
+        window: Optional[int] = 300,
+        cnn_stride: int = 3,
+    ) -> None:
+        self.activity_hint = activity_hint
+        self.fps = fps
+        self.cnn_stride = max(1, cnn_stride)
+        self.stream = StreamingSeries(window)
+        self.activity: Optional[str] = activity_hint if activity_hint in ACTIVITIES else None
+        candidates = [self.activity] if self.activity else sorted(ACTIVITIES)
+        self.accumulators = {a: feature_accumulator(a, fps, window) for a in candidates}
+        self.detector = None if self.activity else ActivityDetectorAccumulator(window)
+        self.cnn_smoother = get_cnn_predictor().new_smoother()
+        self.cnn_shot: Optional[dict[str, Any]] = None
+
+    def push(self, points: np.ndarray, timestamp: float) -> dict[str, Any]:
+        row = self.stream.push(points, timestamp)
+        for acc in self.accumulators.values():
+            acc.push(row)
+        if self.detector is not None:
+            self.detector.push(row)
+
+        out: dict[str, Any] = {
+            "frame_index": self.stream.count - 1,
+            "point": {
+                "timestamp": round(row["timestamps"], 3),
+                "knee_angle": round(row["avg_knee"], 2),
+                "trunk_angle": round(row["trunk"], 2),
+                "hip_y": round(row["hip_y"], 5),
+                "hip_velocity": round(row["hip_velocity"], 4),
+                "hip_acceleration": round(row["hip_acceleration"], 4),
+            },
+            "activity": self.activity,
+        }
+        if len(self.stream) < MIN_FRAMES:
+            return out
+
+        activity = classify_activity(**self.detector.features()) if self.detector else self.activity
+        self.activity = activity
+        features = self.accumulators[activity].features()
+        reference = pin_reference()
+        overall, metrics = score_activity(activity, features)
+
+        if activity == "cricket_cover_drive" and (self.stream.count - 1) % self.cnn_stride == 0:
+            self.cnn_shot = get_cnn_predictor().predict_pose(points, self.cnn_smoother) or self.cnn_shot
+
+        out.update(
+            activity=activity,
+            features={k: round(v, 4) for k, v in features.items()},
+            overall_score=overall,
+            metrics=[m.model_dump() for m in metrics],
+            cnn_shot=self.cnn_shot if activity == "cricket_cover_drive" else None,
+            reference_version=reference.version,
+        )
+        return out
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import Any, Optional
+
+from app.analysis.reference_library import current_reference
+from app.cache import SqliteStore, TTLCache
+
+# Request-level cache for /api/analyze. Values are the serialized
+# AnalysisResponse JSON (before any LLM rewrite), keyed by a BLAKE2b digest of
+# the uploaded body plus every parameter that changes the result, so a repeat
+# upload skips validation, analysis, CNN inference and serialization.
+# ANALYSIS_CACHE_PATH adds a SQLite tier shared by all workers on the host.
+ANALYSIS_CACHE_ENABLED = os.getenv("ANALYSIS_CACHE_ENABLED", "1").lower() not in {"0", "false", "no"}
+# Bump when a code change alters analysis output, so persisted entries are not reused.
+ANALYSIS_CACHE_FORMAT = "2"
+
+_ANALYSIS_CACHE_PATH = os.getenv("ANALYSIS_CACHE_PATH", "")
+_ANALYSIS_CACHE_TTL_S = float(os.getenv("ANALYSIS_CACHE_TTL_S", "3600"))
+# Row cap of the SQLite tier; expired rows are swept as well.
+_ANALYSIS_CACHE_MAX_ROWS = int(os.getenv("ANALYSIS_CACHE_MAX_ROWS", "4096"))
+ANALYSIS_CACHE = TTLCache(
+    max_entries=int(os.getenv("ANALYSIS_CACHE_SIZE", "512")),
+    ttl_s=_ANALYSIS_CACHE_TTL_S,
+    store=(
+        SqliteStore(_ANALYSIS_CACHE_PATH, "analysis_results", _ANALYSIS_CACHE_TTL_S, _ANALYSIS_CACHE_MAX_ROWS)
+        if _ANALYSIS_CACHE_PATH
+        else None
+    ),
+    max_bytes=int(float(os.getenv("ANALYSIS_CACHE_MAX_MB", "256")) * 1024 * 1024),
+    # Entries are [response_json, activity, defer_feedback]; the JSON text is what takes memory.
+    sizeof=lambda entry: len(entry[0]),
+)
+
+
+def upload_digest(content_type: str, body: bytes, params: tuple[Any, ...] = ()) -> str:
+    """Digest of an upload and the options that shape its response.
+
+    JSON bodies carry their own hint, fps and response options; packed uploads
+    pass the query-string values in `params`. The reference library version is
+    the one pinned for the current request.
+    """
+    digest = hashlib.blake2b(body, digest_size=16)
+    digest.update(repr((content_type, params, current_reference().version, ANALYSIS_CACHE_FORMAT)).encode())
+    return digest.hexdigest()
+
+
+def analysis_cache_key(content_type: str, body: bytes, params: tuple[Any, ...] = ()) -> Optional[str]:
+    """`upload_digest`, or None when caching is off."""
+    if not ANALYSIS_CACHE_ENABLED:
+        return None
+    return upload_digest(content_type, body, params)
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import AsyncIterator, Callable, Iterable, Iterator, Optional
+
+import numpy as np
+
+from app.analysis.biomechanics import biomechanics_summary
+from app.analysis.features import series_to_lists
+from app.analysis.kinematics import frames_to_array, series_from_array
+from app.analysis.reference_library import pin_reference, start_reference_watcher
+from app.analysis.segments import analyze_segments, slice_series
+from app.packed import parse_packed_frames
+from app.schemas import BatchAnalysisResult, BatchClip
+
+# Bulk re-scoring: the pure-Python stages of /api/analyze (no CNN, no LLM)
+# run in a process pool so throughput scales with cores. Workers return
+# ready-to-write NDJSON lines, so serialization is parallel too.
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "0")) or os.cpu_count() or 1
+BATCH_INFLIGHT_PER_WORKER = 4
+
+JSON_SUFFIXES = {".json"}
+PACKED_SUFFIXES = {".f32", ".bin"}
+
+_JSON_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_batch_pool() -> ProcessPoolExecutor:
+    """Shared worker pool, started on first use. Spawned so workers never inherit server threads.
+
+    Each worker watches the reference library file itself, like the API process does.
+    """
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ProcessPoolExecutor(
+                    BATCH_WORKERS, mp_context=multiprocessing.get_context("spawn"), initializer=start_reference_watcher
+                )
+    return _POOL
+
+
+def score_clip(clip_id: str, points: np.ndarray, timestamps: np.ndarray, activity_hint: str, fps: float) -> str:
+    """Score one clip and return its `BatchAnalysisResult` as a JSON line."""
+    reference = pin_reference()
+    try:
+        series = series_to_lists(series_from_array(points, timestamps))
+        segments, longest = analyze_segments(series, fps, activity_hint)
+        primary = segments[longest]
+        if len(segments) > 1:
+            series = slice_series(series, primary.start_frame, primary.end_frame)
+        result = BatchAnalysisResult(
+            id=clip_id,
+            activity=primary.activity,
+            overall_score=primary.overall_score,
+            metrics=primary.metrics,
+            biomechanics=biomechanics_summary(primary.activity, series),
+            reps=primary.reps,
+            segments=segments if len(segments) > 1 else [],
+            reference_version=reference.version,
+        )
+    except Exception as exc:  # one bad clip must not abort the batch
+        return _error_line(clip_id, exc)
+    return result.model_dump_json(exclude_none=True) + "\n"
+
+
+def _error_line(clip_id: str, exc: Exception) -> str:
+    return BatchAnalysisResult(id=clip_id, error=f"{type(exc).__name__}: {exc}").model_dump_json(exclude_none=True) + "\n"
+
+
+def load_clip(path: Path, activity_hint: str, fps: float) -> tuple[np.ndarray, np.ndarray, str, float]:
+    """Read a JSON (`AnalysisRequest`/`BatchClip`) or packed float32 clip file.
+
+    JSON files carry their own hint and fps; packed files use the ones given.
+    """
+    if path.suffix.lower() in PACKED_SUFFIXES:
+        points, timestamps = parse_packed_frames(path.read_bytes())
+        return points, timestamps, activity_hint, fps
+    clip = BatchClip.model_validate_json(path.read_bytes())
+    points, timestamps = frames_to_array(clip.frames)
+    return points, timestamps, clip.activity_hint, clip.fps
+
+
+def score_json_line(clip_id: str, line: bytes) -> str:
+    """Worker entry point for NDJSON uploads: validation and frame packing happen in the worker too."""
+    try:
+        clip = BatchClip.model_validate_json(line)
+        points, timestamps = frames_to_array(clip.frames)
+    except Exception as exc:
+        return _error_line(clip_id, exc)
+    return score_clip(clip.id or clip_id, points, timestamps, clip.activity_hint, clip.fps)
+
+
+def split_json_array(body: bytes, key: str = "clips") -> Optional[list[bytes]]:
+    """Raw bytes of each element of the root object's `key` array, or None if the body is not shaped that way.
+
+    Only the envelope is walked here; each element is skipped with the C JSON
+    scanner and handed to the batch workers as text, to be validated there
+    like an NDJSON line.
+    """
+    try:
+        text = body.decode("utf-8")
+        pos = _WHITESPACE.match(text, 0).end()
+        if text[pos : pos + 1] != "{":
+            return None
+        found: Optional[list[bytes]] = None
+        pos = _WHITESPACE.match(text, pos + 1).end()
+        if text[pos : pos + 1] == "}":
+            return None
+        while True:
+            name, pos = _JSON_DECODER.raw_decode(text, pos)
+            pos = _WHITESPACE.match(text, pos).end()
+            if not isinstance(name, str) or text[pos : pos + 1] != ":":
+                return None
+            pos = _WHITESPACE.match(text, pos + 1).end()
+            if name == key and found is None and text[pos : pos + 1] == "[":
+                found, pos = _split_array(text, pos)
+            else:
+                _, pos = _JSON_DECODER.raw_decode(text, pos)
+            pos = _WHITESPACE.match(text, pos).end()
+            sep = text[pos : pos + 1]
+            pos = _WHITESPACE.match(text, pos + 1).end()
+            if sep == "}":
+                return found if pos == len(text) else None
+            if sep != ",":
+                return None
+    except ValueError:  # JSONDecodeError and UnicodeDecodeError
+        return None
+
+
+def _split_array(text: str, pos: int) -> tuple[list[bytes], int]:
+    elements: list[bytes] = []
+    pos = _WHITESPACE.match(text, pos + 1).end()
+    if text[pos : pos + 1] == "]":
+        return elements, pos + 1
+    while True:
+        _, end = _JSON_DECODER.raw_decode(text, pos)
+        elements.append(text[pos:end].encode("utf-8"))
+        pos = _WHITESPACE.match(text, end).end()
+        sep = text[pos : pos + 1]
+        if sep == "]":
+            return elements, pos + 1
+        if sep != ",":
+            raise ValueError("Expected ',' or ']' in array")
+        pos = _WHITESPACE.match(text, pos + 1).end()
+
+
+def score_file(clip_id: str, path: str, activity_hint: str, fps: float) -> str:
+    """Worker entry point for the CLI: parse the file in the worker, then score it."""
+    try:
+        points, timestamps, activity_hint, fps = load_clip(Path(path), activity_hint, fps)
+    except Exception as exc:
+        return _error_line(clip_id, exc)
+    return score_clip(clip_id, points, timestamps, activity_hint, fps)
+
+
+def iter_batch(
+    executor: Executor,
+    fn: Callable[..., str],
+    jobs: Iterable[tuple],
+    max_inflight: Optional[int] = None,
+) -> Iterator[str]:
+    """Run `fn(*job)` for every job and yield results in completion order.
+
+    At most `max_inflight` jobs are queued at once, so arbitrarily long job
+    streams run in bounded memory.
+    """
+    limit = max_inflight or BATCH_WORKERS * BATCH_INFLIGHT_PER_WORKER
+    pending: set[Future] = set()
+    for job in jobs:
+        pending.add(executor.submit(fn, *job))
+        if len(pending) >= limit:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+
+
+async def aiter_batch(
+    executor: Executor,
+    fn: Callable[..., str],
+    jobs: AsyncIterator[tuple],
+    max_inflight: Optional[int] = None,
+) -> AsyncIterator[str]:
+    """Async counterpart of `iter_batch` for streaming HTTP responses."""
+    loop = asyncio.get_running_loop()
+    limit = max_inflight or BATCH_WORKERS * BATCH_INFLIGHT_PER_WORKER
+    pending: set[asyncio.Future] = set()
+    async for job in jobs:
+        pending.add(loop.run_in_executor(executor, fn, *job))
+        if len(pending) >= limit:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+
+
+def collect_clip_files(paths: Iterable[Path], recursive: bool = False) -> Iterator[tuple[str, Path]]:
+    """Expand files and directories into (clip_id, path) pairs; ids are paths relative to the given directory."""
+    suffixes = JSON_SUFFIXES | PACKED_SUFFIXES
+    for root in paths:
+        if root.is_file():
+            yield str(root), root
+            continue
+        pattern = "**/*" if recursive else "*"
+        for path in sorted(root.glob(pattern)):
+            if path.is_file() and path.suffix.lower() in suffixes:
+                yield str(path.relative_to(root)), path
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Score many keypoint clips and write results as NDJSON.")
+    p.add_argument("paths", type=Path, nargs="+", help="Clip files or directories of .json / .f32 / .bin clips.")
+    p.add_argument("-r", "--recursive", action="store_true", help="Descend into subdirectories.")
+    p.add_argument("-o", "--output", type=Path, default=None, help="Output file (default: stdout).")
+    p.add_argument("--activity-hint", default="auto", help="Hint for packed clips; JSON clips carry their own.")
+    p.add_argument("--fps", type=float, default=30.0, help="Frame rate for packed clips.")
+    p.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = parse_args(argv)
+    jobs = (
+        (clip_id, str(path), args.activity_hint, args.fps)
+        for clip_id, path in collect_clip_files(args.paths, args.recursive)
+    )
+    out = args.output.open("w", encoding="utf-8") if args.output else sys.stdout
+    count = errors = 0
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max(1, args.workers), mp_context=multiprocessing.get_context("spawn")) as pool:
+            for line in iter_batch(pool, score_file, jobs, max(1, args.workers) * BATCH_INFLIGHT_PER_WORKER):
+                out.write(line)
+                count += 1
+                errors += '"error":' in line
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(
+        f"scored {count} clips ({errors} errors) in {elapsed:.2f}s, {count / max(elapsed, 1e-9):.1f} clips/s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
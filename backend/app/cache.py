@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+_MISSING = object()
+
+
+class SqliteStore:
+    """Tiny key/value table for sharing JSON-serializable cache entries across workers.
+
+    Rows older than `ttl_s` are deleted when read. Every `sweep_every` writes
+    (and on open) a sweep also deletes the remaining expired rows and trims
+    the table to the newest `max_rows`, so the file stays bounded. Either limit
+    is off when 0.
+    """
+
+    def __init__(self, path: str | Path, table: str, ttl_s: float = 0.0, max_rows: int = 0, sweep_every: int = 64) -> None:
+        self.path = Path(path)
+        self.table = table
+        self.ttl_s = ttl_s
+        self.max_rows = max_rows
+        self.sweep_every = max(1, sweep_every)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        with self._conn() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_created_at ON {table} (created_at)")
+        self.sweep()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_s > 0 and time.time() - created_at >= self.ttl_s
+
+    def get(self, key: str) -> Optional[tuple[Any, float]]:
+        row = self._conn().execute(f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if self._expired(row[1]):
+            with self._conn() as conn:
+                # Matching created_at leaves a row another worker just rewrote alone.
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ? AND created_at = ?", (key, row[1]))
+            return None
+        return json.loads(row[0]), float(row[1])
+
+    def set(self, key: str, value: Any, created_at: float) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), created_at),
+            )
+        with self._writes_lock:
+            self._writes += 1
+            due = self._writes % self.sweep_every == 0
+        if due:
+            self.sweep()
+
+    def sweep(self) -> int:
+        """Delete expired rows and all but the newest `max_rows`; returns how many were deleted."""
+        deleted = 0
+        with self._conn() as conn:
+            if self.ttl_s > 0:
+                deleted += conn.execute(
+                    f"DELETE FROM {self.table} WHERE created_at <= ?", (time.time() - self.ttl_s,)
+                ).rowcount
+            if self.max_rows > 0:
+                deleted += conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN "
+                    f"(SELECT key FROM {self.table} ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_rows,),
+                ).rowcount
+        return deleted
+
+
+class TTLCache:
+    """Thread-safe in-memory LRU with per-entry TTL and an optional SQLite second tier.
+
+    With `max_bytes`, entries are also evicted until the `sizeof` of all
+    cached values fits the budget; a single value larger than it is not kept.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_s: float,
+        store: Optional[SqliteStore] = None,
+        max_bytes: int = 0,
+        sizeof: Callable[[Any], int] = len,
+    ) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_s = ttl_s
+        self.store = store
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries: OrderedDict[str, tuple[Any, float, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._store_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _fresh(self, created_at: float) -> bool:
+        return self.ttl_s <= 0 or time.time() - created_at < self.ttl_s
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._get_memory(key)
+        if value is _MISSING:
+            value = self._get_store(key)
+        return None if value is _MISSING else value
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """`get` for async callers: memory hits stay on the event loop, SQLite lookups run in a thread."""
+        value = self._get_memory(key)
+        if value is _MISSING:
+            value = await run_in_threadpool(self._get_store, key) if self.store is not None else self._get_store(key)
+        return None if value is _MISSING else value
+
+    def set(self, key: str, value: Any) -> None:
+        created_at = self._set_memory(key, value)
+        if self.store is not None:
+            self._set_store(key, value, created_at)
+
+    async def aset(self, key: str, value: Any) -> None:
+        """`set` for async callers; the SQLite write runs in a thread."""
+        created_at = self._set_memory(key, value)
+        if self.store is not None:
+            await run_in_threadpool(self._set_store, key, value, created_at)
+
+    def _get_memory(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._fresh(entry[1]):
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[0]
+                self._bytes -= self._entries.pop(key)[2]
+        return _MISSING
+
+    def _get_store(self, key: str) -> Any:
+        if self.store is not None:
+            try:
+                stored = self.store.get(key)
+            except sqlite3.Error:
+                stored = None
+            if stored is not None and self._fresh(stored[1]):
+                with self._lock:
+                    self._store_hits += 1
+                    self._insert(key, stored[0], stored[1])
+                return stored[0]
+
+        with self._lock:
+            self._misses += 1
+        return _MISSING
+
+    def _set_memory(self, key: str, value: Any) -> float:
+        created_at = time.time()
+        with self._lock:
+            self._insert(key, value, created_at)
+        return created_at
+
+    def _set_store(self, key: str, value: Any, created_at: float) -> None:
+        try:
+            self.store.set(key, value, created_at)
+        except sqlite3.Error:
+            pass
+
+    def _insert(self, key: str, value: Any, created_at: float) -> None:
+        size = self._sizeof(value) if self.max_bytes > 0 else 0
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[2]
+        if self.max_bytes > 0 and size > self.max_bytes:
+            return
+        self._entries[key] = (value, created_at, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or (self.max_bytes > 0 and self._bytes > self.max_bytes):
+            self._bytes -= self._entries.popitem(last=False)[1][2]
+            self._evictions += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            hits = self._hits + self._store_hits
+            lookups = hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_s": self.ttl_s,
+                "persistent": self.store is not None,
+                "hits": hits,
+                "store_hits": self._store_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+# Compact /api/analyze responses: the timeline is downsampled with
+# Largest-Triangle-Three-Buckets, limited to the requested series and
+# returned as columns that share one `timestamps` column. It replaces the
+# row-per-frame `kinematics_stream`, which repeats the same five series.
+DEFAULT_COMPACT_SERIES = ("avg_knee", "trunk", "hip_y", "hip_velocity", "hip_acceleration")
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the `n_out` points Largest-Triangle-Three-Buckets keeps; always includes both ends.
+
+    `y` is one series of shape (n,) or several of shape (k, n) sampled at `x`;
+    several series share the bucket walk and get a (k, n_out) result.
+    """
+    ys = np.atleast_2d(np.asarray(y, dtype=np.float64))
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        out = np.broadcast_to(np.arange(n), (len(ys), n))
+        return out[0] if np.ndim(y) == 1 else out
+
+    # Points 1..n-2 fall into n_out - 2 buckets; each keeps the point forming the
+    # largest triangle with the previous pick and the next bucket's centroid.
+    # Centroids don't depend on the picks, so they are computed up front; only
+    # the argmax over each bucket has to follow the previous pick.
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    sizes = np.diff(np.append(edges, n))[1:]
+    cx = np.add.reduceat(x, edges[1:]) / sizes
+    cy = np.add.reduceat(ys, edges[1:], axis=1) / sizes
+
+    rows = np.arange(len(ys))
+    out = np.empty((len(ys), n_out), dtype=np.intp)
+    out[:, 0], out[:, -1] = 0, n - 1
+    prev = np.zeros(len(ys), dtype=np.intp)
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        px, py = x[prev][:, None], ys[rows, prev][:, None]
+        area = np.abs((px - cx[i]) * (ys[:, lo:hi] - py) - (px - x[lo:hi]) * (cy[:, i, None] - py))
+        prev = lo + area.argmax(axis=1)
+        out[:, i + 1] = prev
+    return out[0] if np.ndim(y) == 1 else out
+
+
+def compact_timeline(
+    series: dict[str, list[float]],
+    names: Optional[Sequence[str]] = None,
+    max_points: int = 500,
+) -> dict[str, list[float]]:
+    """Columnar timeline of `names` on at most `max_points` shared rows.
+
+    A clip of up to `max_points` frames is returned whole. Longer clips give
+    each series `max_points // len(names)` LTTB picks (at least 3) and keep the
+    union of those rows, so peaks of every series survive; series that peak on
+    the same frames share rows, so the union is usually smaller than the budget.
+    """
+    names = [name for name in (DEFAULT_COMPACT_SERIES if names is None else names) if name != "timestamps"]
+    t = np.asarray(series["timestamps"], dtype=np.float64)
+    if len(t) <= max_points:
+        keep = np.arange(len(t))
+    elif names:
+        per_series = max(3, max_points // len(names))
+        ys = np.array([series[name] for name in names], dtype=np.float64)
+        keep = np.unique(lttb_indices(t, ys, per_series))
+    else:
+        keep = np.unique(np.linspace(0, len(t) - 1, max(max_points, 2)).astype(np.intp))
+
+    out = {"timestamps": np.round(t[keep], 4).tolist()}
+    for name in names:
+        out[name] = np.round(np.asarray(series[name], dtype=np.float64)[keep], 4).tolist()
+    return out
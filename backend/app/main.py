@@ -1,34 +1,123 @@
 from __future__ import annotations
 
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Any, Optional
 
-from fastapi import FastAPI
+import numpy as np
+from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from pydantic import ValidationError
 
-from app.analysis.activity import detect_activity
 from app.analysis.biomechanics import biomechanics_summary
 from app.analysis.cricket_shot_classifier import classify_shot_from_series
-from app.analysis.cricket_cnn_inference import predict_from_pose_frames
-from app.analysis.features import (
-    bowling_features_from_series,
-    cover_drive_features_from_series,
-    extract_common_series,
-    kinematics_stream,
-    pushup_features_from_series,
-    squat_features_from_series,
-)
+from app.analysis.cricket_cnn_inference import get_cnn_batcher, get_cnn_predictor, predict_from_pose_array
+from app.analysis.cricket_pose_inference import get_pose_predictor, predict_from_pose_sequence
+from app.analysis.features import kinematics_stream, series_to_lists
 from app.analysis.feedback import (
+    DeferredFeedback,
     deterministic_feedback,
     joint_assessment,
+    llm_enabled,
+    llm_stats,
     maybe_rewrite_with_llm,
     performance_explanations,
 )
-from app.analysis.scoring import score_activity
-from app.schemas import AnalysisRequest, AnalysisResponse, CNNShotSignal
+from app.analysis.kinematics import frames_to_array, series_from_array
+from app.analysis.reference_library import (
+    current_reference,
+    pin_reference,
+    reference_status,
+    reload_reference,
+    start_reference_watcher,
+)
+from app.analysis.segments import analyze_segments, slice_series
+from app.analysis.streaming import LiveSession
+from app.analysis_cache import ANALYSIS_CACHE, analysis_cache_key, upload_digest
+from app.batch import aiter_batch, get_batch_pool, score_json_line, split_json_array
+from app.compact import compact_timeline
+from app.metrics import (
+    ANALYZE_FRAMES,
+    ANALYZE_REQUESTS,
+    SESSIONS_SAVED,
+    REGISTRY,
+    format_family,
+    server_timing_header,
+    stage,
+    start_request_timings,
+)
+from app.packed import MIN_FRAMES, PACKED_CONTENT_TYPE, parse_packed_frames
+from app.schemas import (
+    ActivityHint,
+    AnalysisRequest,
+    AnalysisResponse,
+    BatchAnalysisRequest,
+    CNNShotSignal,
+    FeedbackFollowUp,
+    FramePose,
+    ResponseMode,
+    TimelineSeries,
+)
+from app.sessions import SESSION_ROLLING_WINDOW, SessionStore, get_session_store
+
+ROOT = Path(__file__).resolve().parents[2]
+FRONTEND_DIR = ROOT / "frontend"
+# "image" = rendered-skeleton CNN, "pose" = keypoint temporal model, "auto" = pose when its artifacts exist.
+SHOT_BACKEND = os.getenv("CNN_SHOT_BACKEND", "auto").lower()
+# Load and warm the shot model in the background at startup; /api/ready reports 503 until it finishes.
+CNN_WARMUP = os.getenv("CNN_WARMUP", "0").lower() in {"1", "true", "yes"}
+# gzip responses of at least this many bytes for clients that accept it; 0 disables.
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+
+# Streamed line by line; gzip would buffer the lines in its compressor instead of sending each as it is ready.
+UNCOMPRESSED_PATHS = frozenset({"/api/analyze/batch"})
+
+_WARMUP: dict[str, Any] = {"started": False, "done": False, "elapsed_ms": None}
+
+
+def _use_pose_backend() -> bool:
+    return SHOT_BACKEND == "pose" or (SHOT_BACKEND == "auto" and get_pose_predictor().available())
 
-app = FastAPI(title="Sports Motion Analysis API", version="0.2.0")
+
+def warm_up_shot_model() -> None:
+    start = time.perf_counter()
+    try:
+        (get_pose_predictor() if _use_pose_backend() else get_cnn_predictor()).warm_up()
+    finally:
+        _WARMUP["elapsed_ms"] = round((time.perf_counter() - start) * 1000.0, 1)
+        _WARMUP["done"] = True
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    start_reference_watcher()
+    if CNN_WARMUP:
+        _WARMUP["started"] = True
+        threading.Thread(target=warm_up_shot_model, name="cnn-warmup", daemon=True).start()
+    yield
+
+
+class StreamingSafeGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves the streaming endpoints in UNCOMPRESSED_PATHS alone."""
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and scope["path"] in UNCOMPRESSED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+app = FastAPI(title="Sports Motion Analysis API", version="0.2.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -37,9 +126,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if GZIP_MIN_BYTES > 0:
+    # Level 5 gets most of level 9's ratio on JSON at a fraction of the CPU.
+    app.add_middleware(StreamingSafeGZipMiddleware, minimum_size=GZIP_MIN_BYTES, compresslevel=5)
 
-ROOT = Path(__file__).resolve().parents[2]
-FRONTEND_DIR = ROOT / "frontend"
+DEFERRED_FEEDBACK = DeferredFeedback()
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
 
 
 @app.get("/api/health")
@@ -47,52 +139,479 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
-@app.post("/api/analyze", response_model=AnalysisResponse)
-def analyze(payload: AnalysisRequest) -> AnalysisResponse:
-    frames = payload.frames
-    activity = detect_activity(frames, payload.activity_hint)
+@app.get("/api/ready")
+def ready() -> JSONResponse:
+    """Readiness probe: 503 while the opt-in startup warm-up (CNN_WARMUP=1) is still running.
 
-    series = extract_common_series(frames)
+    A model that failed to load still reports ready, since requests then skip
+    the shot helper instead of waiting on it; `model.load_error` says why.
+    """
+    backend = "pose" if _use_pose_backend() else "image"
+    model = (get_pose_predictor() if backend == "pose" else get_cnn_predictor()).status()
+    is_ready = not CNN_WARMUP or _WARMUP["done"]
+    body = {
+        "status": "ready" if is_ready else "warming_up",
+        "warmup": {"enabled": CNN_WARMUP, **_WARMUP},
+        "shot_backend": backend,
+        "model": model,
+    }
+    return JSONResponse(body, status_code=200 if is_ready else 503)
 
-    if activity == "squat":
-        feature_values = squat_features_from_series(series)
-    elif activity == "cricket_cover_drive":
-        feature_values = cover_drive_features_from_series(series, payload.fps)
-    elif activity == "pushup":
-        feature_values = pushup_features_from_series(series)
-    else:
-        feature_values = bowling_features_from_series(series)
-
-    overall, metrics = score_activity(activity, feature_values)
-    bio = biomechanics_summary(activity, series)
-
-    feedback = deterministic_feedback(activity, metrics)
-    feedback = maybe_rewrite_with_llm(activity, feedback, metrics, bio)
-
-    explanations = performance_explanations(activity, metrics, bio)
-    joints = joint_assessment(activity, metrics)
-    live_stream = kinematics_stream(series)
-
-    timeline = {k: [round(v, 4) for v in vals] for k, vals in series.items()}
-    shot = classify_shot_from_series(series) if activity == "cricket_cover_drive" else None
-    cnn_shot_payload = predict_from_pose_frames(frames) if activity == "cricket_cover_drive" else None
-    cnn_shot = CNNShotSignal(**cnn_shot_payload) if cnn_shot_payload else None
-
-    return AnalysisResponse(
-        activity=activity,
-        overall_score=overall,
-        metrics=metrics,
-        feedback=feedback,
-        coaching_explanations=explanations,
-        timeline=timeline,
-        kinematics_stream=live_stream,
-        biomechanics=bio,
-        joint_assessment=joints,
-        cricket_shot=shot,
-        cnn_shot=cnn_shot,
+
+@app.get("/api/cnn/stats")
+def cnn_stats() -> dict[str, Any]:
+    return get_cnn_batcher().stats()
+
+
+@app.get("/api/llm/stats")
+def llm_cache_stats() -> dict[str, Any]:
+    return llm_stats()
+
+
+def _session_store() -> SessionStore:
+    store = get_session_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="Session store is disabled; set SESSION_STORE_PATH")
+    return store
+
+
+@app.get("/api/sessions")
+def list_sessions(
+    user_id: str = Query(..., min_length=1, max_length=128),
+    activity: Optional[str] = None,
+    before: Optional[float] = None,
+    limit: int = Query(50, ge=1, le=500),
+) -> dict[str, Any]:
+    """Newest-first analyses for a user; page with `before` set to the last `created_at`."""
+    return {"sessions": _session_store().sessions(user_id, activity, before, limit)}
+
+
+@app.get("/api/sessions/trends")
+def session_trends(
+    user_id: str = Query(..., min_length=1, max_length=128),
+    activity: str = Query(...),
+    metric: Optional[str] = None,
+    since: Optional[float] = None,
+    limit: int = Query(200, ge=1, le=5000),
+) -> dict[str, Any]:
+    """Per-metric value/score history with the rolling mean stored at insert time."""
+    return {
+        "window": SESSION_ROLLING_WINDOW,
+        "trends": _session_store().trends(user_id, activity, metric, since, limit),
+    }
+
+
+@app.get("/api/sessions/aggregates")
+def session_aggregates(
+    user_id: str = Query(..., min_length=1, max_length=128),
+    activity: Optional[str] = None,
+) -> dict[str, Any]:
+    return {"window": SESSION_ROLLING_WINDOW, "aggregates": _session_store().aggregates(user_id, activity)}
+
+
+@app.get("/api/reference")
+def reference_info() -> dict[str, Any]:
+    """Version and source of the reference library new requests are scored against."""
+    return reference_status()
+
+
+@app.post("/api/reference/reload")
+def reference_reload() -> dict[str, Any]:
+    """Re-read REFERENCE_LIBRARY_PATH now instead of waiting for the next poll."""
+    reloaded = reload_reference(force=True)
+    return {"reloaded": reloaded, **reference_status()}
+
+
+@app.get("/api/analyze/cache/stats")
+def analysis_cache_stats() -> dict[str, Any]:
+    return ANALYSIS_CACHE.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Prometheus text exposition of stage latencies, request mix and CNN/LLM state."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+def _runtime_metrics() -> str:
+    # A warmed-up model ("ready") is still reported as loaded.
+    cnn_state = get_cnn_predictor().status()["state"].replace("ready", "loaded")
+    batcher = get_cnn_batcher().stats()
+    llm = llm_stats()
+    cache = ANALYSIS_CACHE.stats()
+    reference = current_reference()
+    return "".join(
+        [
+            format_family(
+                "reference_library_info",
+                "gauge",
+                "Reference library version new requests are scored against.",
+                [({"version": reference.version, "source": reference.source}, 1.0)],
+            ),
+            format_family(
+                "analysis_cache_requests_total",
+                "counter",
+                "Analyze result cache lookups by outcome.",
+                [
+                    ({"result": "hit"}, cache["hits"] - cache["store_hits"]),
+                    ({"result": "store_hit"}, cache["store_hits"]),
+                    ({"result": "miss"}, cache["misses"]),
+                ],
+            ),
+            format_family("analysis_cache_entries", "gauge", "Analyze results held in memory.", [({}, cache["entries"])]),
+            format_family("analysis_cache_bytes", "gauge", "Bytes of analyze results held in memory.", [({}, cache["bytes"])]),
+            format_family(
+                "analysis_cache_evictions_total", "counter", "Analyze results evicted by the LRU.", [({}, cache["evictions"])]
+            ),
+            format_family(
+                "cnn_model_state",
+                "gauge",
+                "CNN load state (1 for the current state).",
+                [({"state": state}, float(cnn_state == state)) for state in ("loaded", "failed", "not_loaded", "disabled")],
+            ),
+            format_family("cnn_batches_total", "counter", "Micro-batched CNN forward passes.", [({}, batcher["batches"])]),
+            format_family("cnn_images_total", "counter", "Pose images classified by the CNN.", [({}, batcher["images"])]),
+            format_family("cnn_batch_queue_depth", "gauge", "Sequences waiting for the CNN batcher.", [({}, batcher["queue_depth"])]),
+            format_family(
+                "llm_requests_total",
+                "counter",
+                "LLM feedback rewrites by outcome.",
+                [
+                    ({"outcome": "called"}, llm["calls"]),
+                    ({"outcome": "failed"}, llm["failures"]),
+                    ({"outcome": "timeout"}, llm["timeouts"]),
+                    ({"outcome": "coalesced"}, llm["coalesced"]),
+                    ({"outcome": "cache_hit"}, llm["cache"]["hits"]),
+                    ({"outcome": "uncached"}, llm["uncached"]),
+                ],
+            ),
+            format_family(
+                "llm_fallbacks_total",
+                "counter",
+                "Requests answered with deterministic feedback because the rewrite failed or timed out.",
+                [({}, llm["fallbacks"])],
+            ),
+        ]
     )
 
 
+REGISTRY.register_collector(_runtime_metrics)
+
+
+@app.post(
+    "/api/analyze",
+    response_model=AnalysisResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": AnalysisRequest.model_json_schema()},
+                PACKED_CONTENT_TYPE: {"schema": {"type": "string", "format": "binary"}},
+            },
+        }
+    },
+)
+async def analyze(
+    request: Request,
+    http_response: Response,
+    activity_hint: ActivityHint = "auto",
+    fps: float = Query(30.0, gt=0),
+    defer_feedback: bool = False,
+    response_mode: ResponseMode = "full",
+    max_points: int = Query(500, ge=3),
+    series: Optional[list[TimelineSeries]] = Query(None),
+    user_id: Optional[str] = Query(None, min_length=1, max_length=128),
+) -> AnalysisResponse:
+    """Analyze a JSON `AnalysisRequest` or a packed float32 upload.
+
+    Packed uploads take `activity_hint`, `fps`, `defer_feedback` and the
+    compact-response options from the query string. With `user_id` (and a
+    configured session store) the result is also saved to that user's history.
+    """
+    timings = start_request_timings()
+    # Scores, feedback, the cache key and any LLM rewrite all use this one library version.
+    reference = pin_reference()
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    packed = content_type == PACKED_CONTENT_TYPE
+    upload_format = "packed" if packed else "json"
+
+    # JSON bodies carry their own options; packed uploads are keyed on the query string too.
+    options = (activity_hint, fps, defer_feedback, response_mode, max_points, tuple(series or ())) if packed else ()
+    cache_key = analysis_cache_key(upload_format, body, options)
+    cached = await ANALYSIS_CACHE.aget(cache_key) if cache_key else None
+
+    response: Optional[AnalysisResponse] = None
+    if cached is not None:
+        response_json, activity, defer_feedback = cached
+        ANALYZE_REQUESTS.inc(activity, upload_format)
+    else:
+        response, response_json, defer_feedback, n_frames = await run_in_threadpool(
+            analyze_upload,
+            body,
+            packed,
+            (activity_hint, fps, defer_feedback, response_mode, max_points, series),
+            cache_key is not None,
+        )
+        ANALYZE_REQUESTS.inc(response.activity, upload_format)
+        ANALYZE_FRAMES.observe(n_frames, upload_format)
+        if cache_key:
+            await ANALYSIS_CACHE.aset(cache_key, [response_json, response.activity, defer_feedback])
+
+    store = get_session_store() if user_id else None
+    if store is not None:
+        if response is None:
+            response = AnalysisResponse.model_validate_json(response_json)
+        # Keyed by upload so retries and repeat views of one clip are saved once.
+        upload_key = cache_key or upload_digest(upload_format, body, options)
+        try:
+            with stage("save_session"):
+                saved = await run_in_threadpool(store.save, user_id, upload_key, response)
+            SESSIONS_SAVED.inc("saved" if saved is not None else "duplicate")
+        except sqlite3.Error:
+            SESSIONS_SAVED.inc("error")
+
+    if llm_enabled():
+        if response is None:
+            response = AnalysisResponse.model_validate_json(response_json)
+        rewrite = maybe_rewrite_with_llm(response.activity, response.feedback, response.metrics, response.biomechanics)
+        if defer_feedback:
+            response.feedback_id = DEFERRED_FEEDBACK.submit(rewrite)
+            response.feedback_status = "pending"
+        else:
+            with stage("llm"):
+                response.feedback = await rewrite
+        if response_json is not None:
+            with stage("serialize"):
+                response_json = response.model_dump_json()
+
+    if response_json is not None:
+        http_response = Response(response_json, media_type="application/json")
+    http_response.headers["X-Reference-Version"] = reference.version
+    if cache_key:
+        http_response.headers["X-Analysis-Cache"] = "hit" if cached is not None else "miss"
+    if timings:
+        http_response.headers["Server-Timing"] = server_timing_header(timings)
+    return response if response_json is None else http_response
+
+
+@app.post(
+    "/api/analyze/batch",
+    response_class=StreamingResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": BatchAnalysisRequest.model_json_schema()},
+                NDJSON_CONTENT_TYPE: {"schema": {"type": "string", "description": "One BatchClip JSON object per line"}},
+            },
+        }
+    },
+)
+async def analyze_batch(request: Request) -> StreamingResponse:
+    """Score many clips in the batch process pool and stream `BatchAnalysisResult` lines as they finish.
+
+    Only the pose-based stages run (activity, metrics, biomechanics, reps); no
+    CNN or LLM. Results arrive in completion order and carry the clip `id`
+    (its position in the upload when none is given).
+    """
+    # The body is read up front: a StreamingResponse listens for disconnects
+    # on the same receive channel, so it cannot be consumed lazily.
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type == NDJSON_CONTENT_TYPE:
+        return StreamingResponse(
+            aiter_batch(get_batch_pool(), score_json_line, _ndjson_jobs(body)),
+            media_type=NDJSON_CONTENT_TYPE,
+        )
+
+    clips = await run_in_threadpool(split_json_array, body)
+    if not clips:
+        # Not a {"clips": [...]} body; validate it only to report the standard 422.
+        try:
+            payload = await run_in_threadpool(BatchAnalysisRequest.model_validate_json, body)
+        except ValidationError as exc:
+            raise RequestValidationError(exc.errors(include_url=False)) from exc
+        clips = [clip.model_dump_json().encode() for clip in payload.clips]
+
+    async def jobs():
+        # Clips go to the workers as raw JSON; validation and frame packing happen in the pool.
+        for i, clip in enumerate(clips):
+            yield str(i), clip
+
+    return StreamingResponse(aiter_batch(get_batch_pool(), score_json_line, jobs()), media_type=NDJSON_CONTENT_TYPE)
+
+
+async def _ndjson_jobs(body: bytes):
+    lines = (line for line in body.split(b"\n") if line.strip())
+    for index, line in enumerate(lines):
+        yield str(index), line
+
+
+@app.get("/api/analyze/feedback/{feedback_id}", response_model=FeedbackFollowUp)
+async def analyze_feedback(feedback_id: str) -> FeedbackFollowUp:
+    entry = DEFERRED_FEEDBACK.get(feedback_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired feedback_id")
+    status, feedback = entry
+    return FeedbackFollowUp(feedback_id=feedback_id, status=status, feedback=feedback)
+
+
+@app.websocket("/api/live")
+async def live(
+    websocket: WebSocket,
+    activity_hint: ActivityHint = "auto",
+    fps: float = Query(30.0, gt=0),
+    window: int = 300,
+) -> None:
+    """Incremental live analysis.
+
+    Send frames as JSON (`FramePose` or a list of them) or as binary packed
+    float32 frames; each frame is answered with its kinematics point and,
+    once enough frames arrived, the running features and score.
+    """
+    await websocket.accept()
+    session = LiveSession(activity_hint, fps, window=max(MIN_FRAMES, window))
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            try:
+                points, timestamps = _parse_live_message(message)
+            except ValueError as exc:
+                await websocket.send_json({"error": str(exc)})
+                continue
+            for p, t in zip(points, timestamps):
+                await websocket.send_json(await run_in_threadpool(session.push, p, float(t)))
+    except WebSocketDisconnect:
+        pass
+
+
+def _parse_live_message(message: dict[str, Any]) -> tuple[np.ndarray, np.ndarray]:
+    if message.get("bytes") is not None:
+        return parse_packed_frames(message["bytes"], min_frames=1)
+    try:
+        data = json.loads(message.get("text") or "")
+        frames = [FramePose.model_validate(f) for f in (data if isinstance(data, list) else [data])]
+    except (ValueError, ValidationError) as exc:
+        raise ValueError(f"Invalid frame message: {exc}") from exc
+    if not frames:
+        raise ValueError("Empty frame message")
+    return frames_to_array(frames)
+
+
+def analyze_upload(
+    body: bytes, packed: bool, options: tuple[Any, ...], serialize: bool
+) -> tuple[AnalysisResponse, Optional[str], bool, int]:
+    """Decode an upload, analyze it and serialize the response when it is cached or compact.
+
+    Runs in the threadpool, since validation, frame packing and serialization
+    are CPU-bound on long clips. `options` holds the query-string
+    (activity_hint, fps, defer_feedback, response_mode, max_points, series);
+    JSON bodies replace them with their own. Returns the response, its JSON
+    (or None), the effective defer_feedback and the frame count.
+    """
+    activity_hint, fps, defer_feedback, response_mode, max_points, series = options
+    if packed:
+        try:
+            with stage("parse_packed"):
+                points, timestamps = parse_packed_frames(body)
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+    else:
+        try:
+            with stage("validate"):
+                payload = AnalysisRequest.model_validate_json(body)
+        except ValidationError as exc:
+            raise RequestValidationError(exc.errors(include_url=False)) from exc
+        activity_hint, fps, defer_feedback = payload.activity_hint, payload.fps, payload.defer_feedback
+        response_mode, max_points, series = payload.response_mode, payload.max_points, payload.series
+        with stage("frames_to_array"):
+            points, timestamps = frames_to_array(payload.frames)
+
+    compact = response_mode == "compact"
+    response = run_analysis(points, timestamps, activity_hint, fps, max_points if compact else None, series)
+    response_json = None
+    if serialize or compact:
+        # Serialized directly, skipping FastAPI's jsonable_encoder pass; the model is already validated.
+        with stage("serialize"):
+            response_json = response.model_dump_json()
+    return response, response_json, defer_feedback, len(timestamps)
+
+
+def run_analysis(
+    points: np.ndarray,
+    timestamps: np.ndarray,
+    activity_hint: str,
+    fps: float,
+    compact_points: Optional[int] = None,
+    compact_series: Optional[list[str]] = None,
+) -> AnalysisResponse:
+    """Run every analysis stage; with `compact_points` the timeline is downsampled and kinematics_stream left empty."""
+    with stage("extract_series"):
+        series = series_to_lists(series_from_array(points, timestamps))
+    segments, longest = analyze_segments(series, fps, activity_hint)
+    primary = segments[longest]
+    activity, metrics = primary.activity, primary.metrics
+    # Clip-level fields describe the longest segment when a session mixes activities.
+    scored, scored_points = series, points
+    if len(segments) > 1:
+        scored = slice_series(series, primary.start_frame, primary.end_frame)
+        scored_points = points[primary.start_frame : primary.end_frame]
+
+    with stage("biomechanics"):
+        bio = biomechanics_summary(activity, scored)
+
+    with stage("feedback"):
+        feedback = deterministic_feedback(activity, metrics)
+        explanations = performance_explanations(activity, metrics, bio)
+        joints = joint_assessment(activity, metrics)
+    if compact_points is not None:
+        live_stream = []
+        with stage("timeline"):
+            timeline = compact_timeline(series, compact_series, compact_points)
+    else:
+        with stage("kinematics_stream"):
+            live_stream = kinematics_stream(series)
+        with stage("timeline"):
+            timeline = {k: [round(v, 4) for v in vals] for k, vals in series.items()}
+
+    shot = cnn_shot = None
+    if activity == "cricket_cover_drive":
+        with stage("shot_classifier"):
+            shot = classify_shot_from_series(scored)
+        with stage("cnn"):
+            cnn_shot_payload = predict_cnn_shot(scored_points)
+        cnn_shot = CNNShotSignal(**cnn_shot_payload) if cnn_shot_payload else None
+
+    with stage("build_response"):
+        return AnalysisResponse(
+            activity=activity,
+            overall_score=primary.overall_score,
+            metrics=metrics,
+            feedback=feedback,
+            coaching_explanations=explanations,
+            timeline=timeline,
+            kinematics_stream=live_stream,
+            biomechanics=bio,
+            joint_assessment=joints,
+            cricket_shot=shot,
+            cnn_shot=cnn_shot,
+            reps=primary.reps,
+            segments=segments if len(segments) > 1 else [],
+            reference_version=current_reference().version,
+        )
+
+
+def predict_cnn_shot(points: np.ndarray) -> Optional[dict[str, Any]]:
+    if _use_pose_backend():
+        payload = predict_from_pose_sequence(points)
+        if payload or SHOT_BACKEND == "pose":
+            return payload
+    return predict_from_pose_array(points)
+
+
 if FRONTEND_DIR.exists() and (FRONTEND_DIR / "assets").exists():
     app.mount("/assets", StaticFiles(directory=str(FRONTEND_DIR / "assets")), name="assets")
 
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import bisect
+import math
+import os
+import threading
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, Optional
+
+# Minimal Prometheus-style instrumentation: counters and histograms rendered in
+# the text exposition format, plus `stage()` timers for the analysis path.
+# With METRICS_ENABLED=0 and SERVER_TIMING=0, `stage()` returns a shared no-op
+# context manager and counters return before touching any state.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() not in {"0", "false", "no"}
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0").lower() not in {"0", "false", "no"}
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FRAME_BUCKETS = (10, 30, 60, 120, 300, 600, 1200, 3000, 6000, 18000)
+
+Sample = tuple[dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def format_family(name: str, kind: str, help_text: str, samples: Iterable[Sample]) -> str:
+    """Render one metric family, e.g. gauges computed at scrape time."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+    return "\n".join(lines) + "\n"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> str:
+        with self._lock:
+            items = sorted(self._values.items())
+        return format_family(
+            self.name, "counter", self.help_text, ((dict(zip(self.labels, key)), v) for key, v in items)
+        )
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        if not METRICS_ENABLED:
+            return
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][idx] += 1
+            series[1][0] += value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._series.items())
+        for key, (counts, total) in items:
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = _format_labels({**labels, "le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[Any] = []
+        self._collectors: list[Callable[[], str]] = []
+
+    def counter(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, help_text, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], str]) -> None:
+        """Add a callable rendering families whose values are read at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        return "".join(m.render() for m in self._metrics) + "".join(c() for c in self._collectors)
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram("analysis_stage_seconds", "Time spent per analysis stage.", ("stage",))
+ANALYZE_REQUESTS = REGISTRY.counter(
+    "analyze_requests_total", "Analyze requests by detected activity and upload format.", ("activity", "format")
+)
+ANALYZE_FRAMES = REGISTRY.histogram(
+    "analyze_request_frames", "Frames per analyze request.", ("format",), buckets=FRAME_BUCKETS
+)
+CNN_ERRORS = REGISTRY.counter("cnn_errors_total", "CNN load and inference failures.", ("phase",))
+SESSIONS_SAVED = REGISTRY.counter(
+    "sessions_saved_total", "Analyses written to the session store by outcome.", ("outcome",)
+)
+REFERENCE_RELOADS = REGISTRY.counter(
+    "reference_library_reloads_total", "Reference library file reload attempts by outcome.", ("outcome",)
+)
+
+_TIMINGS: ContextVar[Optional[dict[str, float]]] = ContextVar("stage_timings", default=None)
+_NULL_STAGE = nullcontext()
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> "_Stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        elapsed = time.perf_counter() - self.start
+        STAGE_SECONDS.observe(elapsed, self.name)
+        timings = _TIMINGS.get()
+        if timings is not None:
+            timings[self.name] = timings.get(self.name, 0.0) + elapsed
+
+
+def stage(name: str):
+    """Time a block into `analysis_stage_seconds` and the current request's Server-Timing entries."""
+    if METRICS_ENABLED or SERVER_TIMING:
+        return _Stage(name)
+    return _NULL_STAGE
+
+
+def start_request_timings() -> Optional[dict[str, float]]:
+    """Collect stage timings for this request (and threads it hands work to) when SERVER_TIMING is on."""
+    if not SERVER_TIMING:
+        return None
+    timings: dict[str, float] = {}
+    _TIMINGS.set(timings)
+    return timings
+
+
+def server_timing_header(timings: dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={seconds * 1000.0:.2f}" for name, seconds in timings.items())
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.analysis.constants import KEYPOINT_INDEX
+
+# Packed frame upload for /api/analyze: little-endian float32 body laid out as
+# T timestamps followed by a (T, 17, 3) block of keypoint x/y/score.
+PACKED_CONTENT_TYPE = "application/x-pose-f32"
+MIN_FRAMES = 10
+
+_FLOATS_PER_FRAME = 1 + len(KEYPOINT_INDEX) * 3
+_DTYPE = np.dtype("<f4")
+
+
+def parse_packed_frames(body: bytes, min_frames: int = MIN_FRAMES) -> tuple[np.ndarray, np.ndarray]:
+    """Decode a packed upload into a (T, 17, 3) keypoint array and a (T,) timestamp vector."""
+    frame_bytes = _FLOATS_PER_FRAME * _DTYPE.itemsize
+    if not body or len(body) % frame_bytes:
+        raise ValueError(f"Packed body must be a whole number of {frame_bytes}-byte frames")
+
+    n = len(body) // frame_bytes
+    if n < min_frames:
+        raise ValueError(f"At least {min_frames} frames are required, got {n}")
+
+    flat = np.frombuffer(body, dtype=_DTYPE)
+    timestamps = flat[:n].astype(np.float64)
+    points = flat[n:].reshape(n, len(KEYPOINT_INDEX), 3).astype(np.float64)
+    if not (np.isfinite(timestamps).all() and np.isfinite(points).all()):
+        raise ValueError("Packed body contains non-finite values")
+    return points, timestamps
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+from app.analysis.scoring import apply_overrides, compile_reference, compiled_reference, score_matrix, stack_references
+
+# A/B testing of reference target ranges without recomputing features: the
+# metric values stored in `python -m app.batch` NDJSON output are stacked into
+# one (clips, metrics) matrix per activity and scored against every candidate
+# reference set in a single NumPy pass.
+#
+#   python -m app.batch clips/ -r -o results.ndjson
+#   python -m app.rescore results.ndjson --candidates candidates.json
+#
+# candidates.json: [{"name": "deeper_squat", "overrides": {"squat": {"targets": {"depth_ratio": [0.25, 0.6]}}}}]
+# Stored values are rounded to 4 decimals, which can move scores at a range edge by a hair.
+
+
+def load_feature_matrices(lines: Iterable[str]) -> dict[str, tuple[list[str], list[str], np.ndarray]]:
+    """Per activity: clip ids, metric names and the (N, M) matrix of stored metric values."""
+    grouped: dict[str, tuple[list[str], list[str], list[list[float]]]] = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        if result.get("error") or not result.get("metrics"):
+            continue
+        names = [m["name"] for m in result["metrics"]]
+        ids, metric_names, rows = grouped.setdefault(result["activity"], ([], names, []))
+        if names != metric_names:
+            continue
+        ids.append(result["id"])
+        rows.append([m["value"] for m in result["metrics"]])
+    return {activity: (ids, names, np.array(rows, dtype=np.float64)) for activity, (ids, names, rows) in grouped.items()}
+
+
+def rescore(
+    matrices: dict[str, tuple[list[str], list[str], np.ndarray]], candidates: list[dict[str, Any]]
+) -> dict[str, Any]:
+    names = ["baseline"] + [c["name"] for c in candidates]
+    compiled = [compiled_reference()] + [compile_reference(apply_overrides(c.get("overrides", {}))) for c in candidates]
+
+    report: dict[str, Any] = {}
+    for activity, (ids, metrics, values) in matrices.items():
+        lo, hi, weights = stack_references(compiled, activity, metrics)
+        overall, _, scores = score_matrix(values, lo, hi, weights)
+        baseline_mean = float(overall[0].mean())
+        report[activity] = {
+            "clips": len(ids),
+            "candidates": {
+                name: {
+                    "mean": round(float(overall[r].mean()), 2),
+                    "delta_vs_baseline": round(float(overall[r].mean()) - baseline_mean, 2),
+                    "p10": round(float(np.percentile(overall[r], 10)), 2),
+                    "p50": round(float(np.percentile(overall[r], 50)), 2),
+                    "p90": round(float(np.percentile(overall[r], 90)), 2),
+                    "in_range_rate": {m: round(float((scores[r, :, j] == 100.0).mean()), 4) for j, m in enumerate(metrics)},
+                }
+                for r, name in enumerate(names)
+            },
+        }
+    return report
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Re-score batch results against candidate reference target ranges.")
+    p.add_argument("results", type=Path, nargs="+", help="NDJSON files written by `python -m app.batch`.")
+    p.add_argument("--candidates", type=Path, default=None, help="JSON list of {name, overrides} reference sets.")
+    p.add_argument("-o", "--output", type=Path, default=None, help="Write the full report as JSON.")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = parse_args(argv)
+    candidates = json.loads(args.candidates.read_text(encoding="utf-8")) if args.candidates else []
+    lines = (line for path in args.results for line in path.open(encoding="utf-8"))
+    report = rescore(load_feature_matrices(lines), candidates)
+
+    for activity, result in report.items():
+        print(f"\n{activity} ({result['clips']} clips)")
+        print(f"  {'candidate':<24}{'mean':>8}{'delta':>8}{'p10':>8}{'p50':>8}{'p90':>8}")
+        for name, c in result["candidates"].items():
+            print(
+                f"  {name:<24}{c['mean']:>8.2f}{c['delta_vs_baseline']:>+8.2f}{c['p10']:>8.2f}{c['p50']:>8.2f}{c['p90']:>8.2f}"
+            )
+    if not report:
+        print("no scored clips found", file=sys.stderr)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,10 +16,39 @@ class FramePose(BaseModel):
     keypoints: list[Keypoint] = Field(..., min_length=17, max_length=17)
 
 
+ActivityHint = Literal["auto", "squat", "cricket_cover_drive", "pushup", "bowling"]
+ResponseMode = Literal["full", "compact"]
+TimelineSeries = Literal[
+    "timestamps",
+    "left_knee",
+    "right_knee",
+    "avg_knee",
+    "trunk",
+    "nose_x",
+    "hip_y",
+    "hip_x",
+    "wrist_x",
+    "wrist_y",
+    "shoulder_y",
+    "left_elbow",
+    "right_elbow",
+    "hip_velocity",
+    "hip_acceleration",
+]
+
+
 class AnalysisRequest(BaseModel):
-    activity_hint: Literal["auto", "squat", "cricket_cover_drive", "pushup", "bowling"] = "auto"
-    fps: float = 30.0
+    activity_hint: ActivityHint = "auto"
+    fps: float = Field(30.0, gt=0)
     frames: list[FramePose] = Field(..., min_length=10)
+    defer_feedback: bool = Field(False, description="Return deterministic feedback now and fetch the LLM rewrite later")
+    response_mode: ResponseMode = Field(
+        "full", description="compact: downsampled columnar timeline and no per-frame kinematics_stream"
+    )
+    max_points: int = Field(500, ge=3, description="Compact mode: timeline rows kept by LTTB downsampling")
+    series: Optional[list[TimelineSeries]] = Field(
+        None, description="Compact mode: timeline series to return (default: the kinematics_stream series)"
+    )
 
 
 class MetricResult(BaseModel):
@@ -58,7 +87,40 @@ class CricketShotClassification(BaseModel):
 class CNNShotSignal(BaseModel):
     label: str
     confidence: float
-    source: Literal["cnn"] = "cnn"
+    source: Literal["cnn", "pose"] = "cnn"
+
+
+class RepResult(BaseModel):
+    index: int
+    start_frame: int
+    end_frame: int
+    start_time: float
+    end_time: float
+    duration_s: float
+    overall_score: float
+    metrics: list[MetricResult]
+
+
+class RepSummary(BaseModel):
+    count: int
+    reps: list[RepResult] = Field(default_factory=list)
+    mean_score: float = 0.0
+    min_score: float = 0.0
+    max_score: float = 0.0
+    mean_duration_s: float = 0.0
+    tempo_stdev_s: float = 0.0
+    metric_means: dict[str, float] = Field(default_factory=dict)
+
+
+class ActivitySegment(BaseModel):
+    activity: str
+    start_frame: int
+    end_frame: int
+    start_s: float
+    end_s: float
+    overall_score: float
+    metrics: list[MetricResult]
+    reps: Optional[RepSummary] = None
 
 
 class AnalysisResponse(BaseModel):
@@ -73,3 +135,40 @@ class AnalysisResponse(BaseModel):
     joint_assessment: dict[str, str]
     cricket_shot: Optional[CricketShotClassification] = None
     cnn_shot: Optional[CNNShotSignal] = None
+    reps: Optional[RepSummary] = None
+    segments: list[ActivitySegment] = Field(default_factory=list)
+    feedback_status: Literal["final", "pending"] = "final"
+    feedback_id: Optional[str] = None
+    # Content hash of the reference library the scores and feedback came from.
+    reference_version: str
+
+
+class BatchClip(BaseModel):
+    id: Optional[str] = None
+    activity_hint: ActivityHint = "auto"
+    fps: float = Field(30.0, gt=0)
+    frames: list[FramePose] = Field(..., min_length=10)
+
+
+class BatchAnalysisRequest(BaseModel):
+    clips: list[BatchClip] = Field(..., min_length=1)
+
+
+class BatchAnalysisResult(BaseModel):
+    """One NDJSON line of a batch run; `error` is set instead of the scores when a clip fails."""
+
+    id: str
+    activity: Optional[str] = None
+    overall_score: Optional[float] = None
+    metrics: list[MetricResult] = Field(default_factory=list)
+    biomechanics: Optional[BiomechanicsSummary] = None
+    reps: Optional[RepSummary] = None
+    segments: list[ActivitySegment] = Field(default_factory=list)
+    reference_version: Optional[str] = None
+    error: Optional[str] = None
+
+
+class FeedbackFollowUp(BaseModel):
+    feedback_id: str
+    status: Literal["final", "pending"]
+    feedback: Optional[list[str]] = None
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from app.schemas import AnalysisResponse
+
+# Server-side analysis history for the dashboard. Each saved analysis is one
+# `sessions` row plus one `session_metrics` row per metric (and one for the
+# overall score). Aggregates are maintained on insert rather than on read:
+# every metric row stores the rolling mean score over the user's last
+# SESSION_ROLLING_WINDOW sessions of that activity, and `metric_aggregates`
+# keeps running count/sum/best/EWMA per (user, activity, metric). A trend or
+# summary read is then a single indexed range query.
+SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH", "")
+SESSION_ROLLING_WINDOW = max(1, int(os.getenv("SESSION_ROLLING_WINDOW", "5")))
+EWMA_ALPHA = 0.3
+OVERALL = "overall_score"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    upload_key TEXT NOT NULL,
+    activity TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    overall_score REAL NOT NULL,
+    duration_s REAL NOT NULL,
+    rep_count INTEGER,
+    biomechanics TEXT NOT NULL,
+    UNIQUE (user_id, upload_key)
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_time ON sessions (user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_activity_time ON sessions (user_id, activity, created_at);
+
+CREATE TABLE IF NOT EXISTS session_metrics (
+    session_id INTEGER NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    user_id TEXT NOT NULL,
+    activity TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    value REAL NOT NULL,
+    score REAL NOT NULL,
+    rolling_score REAL NOT NULL,
+    PRIMARY KEY (session_id, metric)
+);
+CREATE INDEX IF NOT EXISTS idx_session_metrics_trend ON session_metrics (user_id, activity, metric, created_at);
+
+CREATE TABLE IF NOT EXISTS metric_aggregates (
+    user_id TEXT NOT NULL,
+    activity TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    sum_value REAL NOT NULL,
+    sum_score REAL NOT NULL,
+    best_score REAL NOT NULL,
+    last_value REAL NOT NULL,
+    last_score REAL NOT NULL,
+    ewma_score REAL NOT NULL,
+    window_sum REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (user_id, activity, metric)
+);
+"""
+
+
+class SessionStore:
+    """SQLite session history with incrementally maintained trend aggregates."""
+
+    def __init__(self, path: str | Path, window: int = SESSION_ROLLING_WINDOW) -> None:
+        self.path = Path(path)
+        self.window = window
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def save(self, user_id: str, upload_key: str, response: AnalysisResponse) -> Optional[int]:
+        """Record one analysis; returns the session id, or None if this upload was already saved for the user."""
+        now = time.time()
+        timestamps = response.timeline.get("timestamps") or [0.0]
+        rows = [(m.name, m.value, m.score) for m in response.metrics]
+        rows.append((OVERALL, response.overall_score, response.overall_score))
+
+        with self._conn() as conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO sessions (user_id, upload_key, activity, created_at, overall_score, duration_s,"
+                " rep_count, biomechanics) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    user_id,
+                    upload_key,
+                    response.activity,
+                    now,
+                    response.overall_score,
+                    round(timestamps[-1] - timestamps[0], 3),
+                    response.reps.count if response.reps else None,
+                    response.biomechanics.model_dump_json(),
+                ),
+            )
+            if cur.rowcount == 0:
+                return None
+            session_id = int(cur.lastrowid)
+            for metric, value, score in rows:
+                self._add_metric(conn, session_id, user_id, response.activity, metric, value, score, now)
+        return session_id
+
+    def _add_metric(
+        self,
+        conn: sqlite3.Connection,
+        session_id: int,
+        user_id: str,
+        activity: str,
+        metric: str,
+        value: float,
+        score: float,
+        now: float,
+    ) -> None:
+        key = (user_id, activity, metric)
+        agg = conn.execute(
+            "SELECT n, ewma_score, window_sum FROM metric_aggregates WHERE user_id = ? AND activity = ? AND metric = ?",
+            key,
+        ).fetchone()
+        n, ewma, window_sum = (agg["n"], agg["ewma_score"], agg["window_sum"]) if agg else (0, score, 0.0)
+
+        # The oldest score in the current window drops out once this one is added. Saves
+        # within one clock tick share created_at, so the session id breaks ties.
+        if n >= self.window:
+            dropped = conn.execute(
+                "SELECT score FROM session_metrics WHERE user_id = ? AND activity = ? AND metric = ?"
+                " ORDER BY created_at DESC, session_id DESC LIMIT 1 OFFSET ?",
+                (*key, self.window - 1),
+            ).fetchone()
+            window_sum -= dropped["score"]
+        window_sum += score
+        rolling = window_sum / min(n + 1, self.window)
+        ewma = score if n == 0 else EWMA_ALPHA * score + (1.0 - EWMA_ALPHA) * ewma
+
+        conn.execute(
+            "INSERT INTO session_metrics (session_id, user_id, activity, metric, created_at, value, score, rolling_score)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (session_id, *key, now, value, score, rolling),
+        )
+        conn.execute(
+            "INSERT INTO metric_aggregates (user_id, activity, metric, n, sum_value, sum_score, best_score, last_value,"
+            " last_score, ewma_score, window_sum, updated_at) VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (user_id, activity, metric) DO UPDATE SET n = n + 1, sum_value = sum_value + excluded.sum_value,"
+            " sum_score = sum_score + excluded.sum_score, best_score = MAX(best_score, excluded.best_score),"
+            " last_value = excluded.last_value, last_score = excluded.last_score, ewma_score = excluded.ewma_score,"
+            " window_sum = excluded.window_sum, updated_at = excluded.updated_at",
+            (*key, value, score, score, value, score, ewma, window_sum, now),
+        )
+
+    def sessions(
+        self, user_id: str, activity: Optional[str] = None, before: Optional[float] = None, limit: int = 50
+    ) -> list[dict[str, Any]]:
+        """Newest-first session rows, paged with `before` (a `created_at`)."""
+        sql = "SELECT id, activity, created_at, overall_score, duration_s, rep_count, biomechanics FROM sessions WHERE user_id = ?"
+        params: list[Any] = [user_id]
+        if activity:
+            sql += " AND activity = ?"
+            params.append(activity)
+        if before is not None:
+            sql += " AND created_at < ?"
+            params.append(before)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        return [
+            {**dict(row), "biomechanics": json.loads(row["biomechanics"])}
+            for row in self._conn().execute(sql, params).fetchall()
+        ]
+
+    def trends(
+        self, user_id: str, activity: str, metric: Optional[str] = None, since: Optional[float] = None, limit: int = 200
+    ) -> dict[str, list[dict[str, float]]]:
+        """Per-metric points (oldest first) with their precomputed rolling mean score; at most `limit` per metric."""
+        sql = (
+            "SELECT metric, created_at, value, score, rolling_score FROM ("
+            " SELECT *, ROW_NUMBER() OVER (PARTITION BY metric ORDER BY created_at DESC, session_id DESC) AS rn"
+            " FROM session_metrics WHERE user_id = ? AND activity = ?"
+        )
+        params: list[Any] = [user_id, activity]
+        if metric:
+            sql += " AND metric = ?"
+            params.append(metric)
+        if since is not None:
+            sql += " AND created_at >= ?"
+            params.append(since)
+        sql += ") WHERE rn <= ? ORDER BY metric, created_at, session_id"
+        params.append(limit)
+
+        out: dict[str, list[dict[str, float]]] = {}
+        for row in self._conn().execute(sql, params):
+            out.setdefault(row["metric"], []).append(
+                {"t": row["created_at"], "value": row["value"], "score": row["score"], "rolling_score": row["rolling_score"]}
+            )
+        return out
+
+    def aggregates(self, user_id: str, activity: Optional[str] = None) -> list[dict[str, Any]]:
+        """Running per-metric aggregates for the user, straight from `metric_aggregates`."""
+        sql = "SELECT * FROM metric_aggregates WHERE user_id = ?"
+        params: list[Any] = [user_id]
+        if activity:
+            sql += " AND activity = ?"
+            params.append(activity)
+        out = []
+        for row in self._conn().execute(sql + " ORDER BY activity, metric", params):
+            n = row["n"]
+            out.append(
+                {
+                    "activity": row["activity"],
+                    "metric": row["metric"],
+                    "count": n,
+                    "mean_value": row["sum_value"] / n,
+                    "mean_score": row["sum_score"] / n,
+                    "best_score": row["best_score"],
+                    "last_value": row["last_value"],
+                    "last_score": row["last_score"],
+                    "ewma_score": row["ewma_score"],
+                    "rolling_score": row["window_sum"] / min(n, self.window),
+                    "updated_at": row["updated_at"],
+                }
+            )
+        return out
+
+
+_STORE: Optional[SessionStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_session_store() -> Optional[SessionStore]:
+    """The configured store, opened on first use; None when SESSION_STORE_PATH is unset."""
+    global _STORE
+    if _STORE is None and SESSION_STORE_PATH:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = SessionStore(SESSION_STORE_PATH)
+    return _STORE
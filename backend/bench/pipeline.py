@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from app.analysis.activity import activity_segments
+from app.analysis.biomechanics import biomechanics_summary
+from app.analysis.cricket_cnn_inference import get_cnn_predictor
+from app.analysis.cricket_shot_classifier import classify_shot_from_series
+from app.analysis.features import activity_features_from_series, kinematics_stream, series_to_lists
+from app.analysis.feedback import deterministic_feedback, joint_assessment, performance_explanations
+from app.analysis.kinematics import frames_to_array, series_from_array
+from app.analysis.reference_library import current_reference
+from app.analysis.reps import rep_summary
+from app.analysis.scoring import score_activity
+from app.compact import compact_timeline
+from app.packed import parse_packed_frames
+from app.schemas import AnalysisRequest, AnalysisResponse
+from bench.synthetic import GENERATORS, generate_clip, to_packed, to_request_json
+
+# Times every stage of /api/analyze on synthetic clips, one activity at a time:
+#
+#   cd backend
+#   python -m bench.pipeline --frames 300 --fps 30 --repeat 50 --save bench/baselines/local.json
+#   python -m bench.pipeline --compare bench/baselines/local.json
+#
+# Stages run in the same order as `run_analysis`. Timing passes run without
+# tracemalloc; a separate pass records each stage's peak allocation.
+
+PERCENTILES = (50, 90, 99)
+CNN_STRIDE = 3
+CNN_MAX_FRAMES = 7
+
+
+class StageRecorder:
+    """Collects wall times per stage, or peak traced memory when `trace_memory` is set."""
+
+    def __init__(self, trace_memory: bool = False) -> None:
+        self.trace_memory = trace_memory
+        self.times: dict[str, list[float]] = {}
+        self.peak_kib: dict[str, float] = {}
+
+    def run(self, stage: str, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            result = fn(*args)
+            self.peak_kib[stage] = (tracemalloc.get_traced_memory()[1] - base) / 1024.0
+            return result
+        start = time.perf_counter()
+        result = fn(*args)
+        self.times.setdefault(stage, []).append((time.perf_counter() - start) * 1000.0)
+        return result
+
+
+def run_pipeline(rec: StageRecorder, activity: str, body: bytes, packed: bytes) -> None:
+    """One pass over the analyze stages; mirrors `app.main.run_analysis`."""
+    # The packed decoder is the alternative to the two JSON stages, so it stays out of the total.
+    rec.run("parse_packed", parse_packed_frames, packed)
+    total = time.perf_counter()
+    payload = rec.run("validate_json", AnalysisRequest.model_validate_json, body)
+    points, timestamps = rec.run("frames_to_array", frames_to_array, payload.frames)
+    fps = payload.fps
+
+    series = rec.run("extract_common_series", lambda: series_to_lists(series_from_array(points, timestamps)))
+    # Detection always runs in auto mode and must recover the generated activity.
+    segments = rec.run("detect_activity", activity_segments, series, fps, "auto")
+    detected = sorted({label for label, _, _ in segments})
+    if detected != [activity]:
+        raise RuntimeError(f"synthetic {activity} clip detected as {segments}")
+    features = rec.run("features", activity_features_from_series, activity, series, fps)
+    overall, metrics = rec.run("score_activity", score_activity, activity, features)
+    bio = rec.run("biomechanics_summary", biomechanics_summary, activity, series)
+    feedback = rec.run("feedback", deterministic_feedback, activity, metrics)
+    explanations = rec.run("explanations", performance_explanations, activity, metrics, bio)
+    joints = rec.run("joint_assessment", joint_assessment, activity, metrics)
+    stream = rec.run("kinematics_stream", kinematics_stream, series)
+    timeline = rec.run("timeline", lambda: {k: [round(v, 4) for v in vals] for k, vals in series.items()})
+    reps = rec.run("reps", rep_summary, activity, series, fps)
+
+    shot = None
+    if activity == "cricket_cover_drive":
+        shot = rec.run("classify_shot_from_series", classify_shot_from_series, series)
+        predictor = get_cnn_predictor()
+        sampled = points[::CNN_STRIDE][:CNN_MAX_FRAMES, :, :2]
+        rec.run("cnn_render", predictor.render_poses, sampled)
+        if predictor.status()["state"] == "ready":
+            # Render, forward pass and smoothing, as the batcher runs them for one request.
+            rec.run("cnn_predict", predictor.predict_pose_sequences, [sampled])
+
+    response = AnalysisResponse(
+        activity=activity,
+        overall_score=overall,
+        metrics=metrics,
+        feedback=feedback,
+        coaching_explanations=explanations,
+        timeline=timeline,
+        kinematics_stream=stream,
+        biomechanics=bio,
+        joint_assessment=joints,
+        cricket_shot=shot,
+        reps=reps,
+        reference_version=current_reference().version,
+    )
+    rec.run("serialize_response", response.model_dump_json)
+    if not rec.trace_memory:
+        rec.times.setdefault("total", []).append((time.perf_counter() - total) * 1000.0)
+
+    # response_mode=compact replaces the timeline/kinematics_stream stages; also kept out of the total.
+    response.timeline = rec.run("compact_timeline", compact_timeline, series, None, 500)
+    response.kinematics_stream = []
+    rec.run("serialize_compact", response.model_dump_json)
+
+
+def summarize(times: list[float]) -> dict[str, float]:
+    arr = np.asarray(times)
+    out = {f"p{q}_ms": round(float(np.percentile(arr, q)), 4) for q in PERCENTILES}
+    out["mean_ms"] = round(float(arr.mean()), 4)
+    out["min_ms"] = round(float(arr.min()), 4)
+    return out
+
+
+def bench_activity(activity: str, frames: int, fps: float, repeat: int, warmup: int, seed: int) -> dict[str, Any]:
+    points, timestamps = generate_clip(activity, frames, fps, seed=seed)
+    body = to_request_json(points, timestamps, "auto", fps)
+    packed = to_packed(points, timestamps)
+
+    rec = StageRecorder()
+    for _ in range(warmup):
+        run_pipeline(rec, activity, body, packed)
+    rec.times.clear()
+    for _ in range(repeat):
+        run_pipeline(rec, activity, body, packed)
+
+    mem = StageRecorder(trace_memory=True)
+    tracemalloc.start()
+    try:
+        run_pipeline(mem, activity, body, packed)
+    finally:
+        tracemalloc.stop()
+
+    stages = {}
+    for stage, times in rec.times.items():
+        stages[stage] = summarize(times)
+        if stage in mem.peak_kib:
+            stages[stage]["peak_kib"] = round(mem.peak_kib[stage], 1)
+    return {"request_bytes": len(body), "packed_bytes": len(packed), "stages": stages}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    predictor = get_cnn_predictor()
+    # warm_up loads the model and runs it once, so the first timed pass doesn't pay for either.
+    cnn_loaded = predictor.warm_up() if args.cnn else False
+    results = {
+        activity: bench_activity(activity, args.frames, args.fps, args.repeat, args.warmup, args.seed)
+        for activity in args.activities
+    }
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "frames": args.frames,
+            "fps": args.fps,
+            "repeat": args.repeat,
+            "cnn_loaded": cnn_loaded,
+            "cnn_load_error": predictor.status()["load_error"] if args.cnn else None,
+            "max_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0, 1),
+        },
+        "results": results,
+    }
+
+
+def print_report(report: dict[str, Any]) -> None:
+    meta = report["meta"]
+    print(
+        f"commit={meta['commit']} frames={meta['frames']} fps={meta['fps']} repeat={meta['repeat']} "
+        f"cnn_loaded={meta['cnn_loaded']} max_rss={meta['max_rss_mib']} MiB"
+    )
+    for activity, result in report["results"].items():
+        print(f"\n{activity} ({result['request_bytes']} B json, {result['packed_bytes']} B packed)")
+        print(f"  {'stage':<26}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'peak KiB':>11}")
+        for stage, s in result["stages"].items():
+            peak = f"{s['peak_kib']:>11.1f}" if "peak_kib" in s else f"{'':>11}"
+            print(f"  {stage:<26}{s['p50_ms']:>10.3f}{s['p90_ms']:>10.3f}{s['p99_ms']:>10.3f}{peak}")
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], threshold: float, min_delta_ms: float) -> list[str]:
+    """Stages whose p50 grew by more than `threshold` (relative) and `min_delta_ms` (absolute)."""
+    regressions = []
+    print(f"\nvs baseline commit={baseline['meta'].get('commit')} ({baseline['meta'].get('created')})")
+    for key in ("frames", "fps"):
+        if baseline["meta"].get(key) != report["meta"][key]:
+            print(f"  warning: baseline {key}={baseline['meta'].get(key)} differs from this run ({report['meta'][key]})")
+    for activity, result in report["results"].items():
+        old_stages = baseline["results"].get(activity, {}).get("stages", {})
+        for stage, s in result["stages"].items():
+            old = old_stages.get(stage)
+            if old is None:
+                continue
+            new_p50, old_p50 = s["p50_ms"], old["p50_ms"]
+            ratio = new_p50 / old_p50 if old_p50 > 0 else float("inf")
+            flag = ""
+            if ratio > 1.0 + threshold and new_p50 - old_p50 > min_delta_ms:
+                flag = "  REGRESSION"
+                regressions.append(f"{activity}/{stage}")
+            print(f"  {activity:<20}{stage:<26}{old_p50:>10.3f} -> {new_p50:>10.3f} ms  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark the /api/analyze pipeline stage by stage on synthetic clips.")
+    p.add_argument("--activities", nargs="+", choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    p.add_argument("--frames", type=int, default=300)
+    p.add_argument("--fps", type=float, default=30.0)
+    p.add_argument("--repeat", type=int, default=30)
+    p.add_argument("--warmup", type=int, default=3)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--cnn", action="store_true", help="Load the shot CNN (CNN_MODEL_DIR) and time inference too.")
+    p.add_argument("--save", type=Path, default=None, help="Write the report as a JSON baseline.")
+    p.add_argument("--compare", type=Path, default=None, help="Baseline JSON to compare p50s against.")
+    p.add_argument("--threshold", type=float, default=0.15, help="Relative p50 slowdown counted as a regression.")
+    p.add_argument("--min-delta-ms", type=float, default=0.05, help="Ignore slowdowns smaller than this.")
+    p.add_argument("--fail-on-regression", action="store_true")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = parse_args(argv)
+    report = run(args)
+    print_report(report)
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nsaved baseline to {args.save}")
+
+    if args.compare:
+        regressions = compare(report, json.loads(args.compare.read_text(encoding="utf-8")), args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            if args.fail_on_regression:
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+# Cold-start benchmark for API workers: imports `app.main` in fresh
+# interpreters under `python -X importtime`, reports the median import cost
+# (total and per top-level package) and fails if any heavy optional
+# dependency is loaded at import time.
+#
+#   cd backend
+#   python -m bench.startup --save bench/baselines/startup.json
+#   python -m bench.startup --compare bench/baselines/startup.json --fail-on-regression
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+TARGET = "app.main"
+# Must only be imported when their feature is first used.
+LAZY_MODULES = ("openai", "torch", "torchvision", "PIL")
+
+
+def _run(code: str, importtime: bool = False) -> tuple[float, str, str]:
+    cmd = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", code]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    return (time.perf_counter() - start) * 1000.0, proc.stdout, proc.stderr
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int, int]]:
+    """Map module -> (self_us, cumulative_us, depth) from `-X importtime` output."""
+    out: dict[str, tuple[int, int, int]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        out[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return out
+
+
+def measure(runs: int) -> dict[str, Any]:
+    wall, baseline_wall, import_ms = [], [], []
+    packages: dict[str, list[float]] = {}
+    for _ in range(runs):
+        baseline_wall.append(_run("pass")[0])
+        elapsed, _, stderr = _run(f"import {TARGET}", importtime=True)
+        wall.append(elapsed)
+        modules = parse_importtime(stderr)
+        import_ms.append(modules[TARGET][1] / 1000.0)
+        per_package: dict[str, float] = {}
+        for name, (self_us, _, _) in modules.items():
+            top = name.split(".")[0]
+            per_package[top] = per_package.get(top, 0.0) + self_us / 1000.0
+        for top, ms in per_package.items():
+            packages.setdefault(top, []).append(ms)
+
+    _, stdout, _ = _run(
+        f"import json, sys, {TARGET}; print(json.dumps([m for m in {list(LAZY_MODULES)!r} if m in sys.modules]))"
+    )
+    return {
+        "import_ms": round(statistics.median(import_ms), 1),
+        "wall_ms": round(statistics.median(wall), 1),
+        "interpreter_ms": round(statistics.median(baseline_wall), 1),
+        "eager_heavy_modules": json.loads(stdout.strip().splitlines()[-1]),
+        "packages_ms": {
+            top: round(statistics.median(times), 1)
+            for top, times in sorted(packages.items(), key=lambda kv: -statistics.median(kv[1]))
+            if len(times) == runs
+        },
+    }
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Measure API worker import time.")
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--top", type=int, default=12, help="Packages to list by import self-time.")
+    p.add_argument("--save", type=Path, default=None)
+    p.add_argument("--compare", type=Path, default=None)
+    p.add_argument("--threshold", type=float, default=0.2, help="Relative import_ms growth counted as a regression.")
+    p.add_argument("--fail-on-regression", action="store_true")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = parse_args(argv)
+    result = measure(max(1, args.runs))
+
+    print(
+        f"import {TARGET}: {result['import_ms']:.1f} ms (process wall {result['wall_ms']:.1f} ms, "
+        f"bare interpreter {result['interpreter_ms']:.1f} ms, median of {args.runs})"
+    )
+    for top, ms in list(result["packages_ms"].items())[: args.top]:
+        print(f"  {top:<28}{ms:>9.1f} ms")
+
+    failed = False
+    if result["eager_heavy_modules"]:
+        print(f"\nloaded at import time but should be lazy: {', '.join(result['eager_heavy_modules'])}")
+        failed = True
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"\nsaved baseline to {args.save}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        ratio = result["import_ms"] / max(baseline["import_ms"], 1e-9)
+        print(f"\nvs baseline: {baseline['import_ms']:.1f} -> {result['import_ms']:.1f} ms  x{ratio:.2f}")
+        if ratio > 1.0 + args.threshold:
+            print("REGRESSION")
+            failed = failed or args.fail_on_regression
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import json
+from typing import Callable
+
+import numpy as np
+
+from app.analysis.constants import KEYPOINT_INDEX
+
+# Synthetic COCO-17 keypoint clips for benchmarking. Coordinates are
+# normalized image coordinates (y grows downward). Limbs are placed with
+# two-link IK from fixed segment lengths, so joint angles bend the way real
+# movements do instead of just translating points.
+
+THIGH = 0.18
+SHIN = 0.18
+UPPER_ARM = 0.13
+FOREARM = 0.12
+
+
+def _phase(t: np.ndarray, period: float) -> np.ndarray:
+    """0 at rest, 1 at the bottom/peak of each repetition."""
+    return (1.0 - np.cos(2.0 * np.pi * t / period)) / 2.0
+
+
+def _two_link(root: np.ndarray, end: np.ndarray, l1: float, l2: float, bend: float) -> np.ndarray:
+    """Middle joint of a two-segment limb from `root` to `end`; `bend` (+1/-1) picks the side it folds to."""
+    d = end - root
+    dist = np.clip(np.linalg.norm(d, axis=-1, keepdims=True), 1e-6, l1 + l2 - 1e-6)
+    along = (l1**2 - l2**2 + dist**2) / (2.0 * dist)
+    height = np.sqrt(np.maximum(l1**2 - along**2, 0.0))
+    unit = d / dist
+    normal = np.stack([-unit[:, 1], unit[:, 0]], axis=-1)
+    return root + unit * along + bend * normal * height
+
+
+def _head(points: dict[str, np.ndarray], neck: np.ndarray, facing: float) -> None:
+    points["nose"] = neck + [0.03 * facing, -0.08]
+    points["left_eye"] = neck + [0.02 * facing - 0.012, -0.095]
+    points["right_eye"] = neck + [0.02 * facing + 0.012, -0.095]
+    points["left_ear"] = neck + [-0.025, -0.085]
+    points["right_ear"] = neck + [0.025, -0.085]
+
+
+def _squat(t: np.ndarray) -> dict[str, np.ndarray]:
+    p = _phase(t, 2.4)[:, None]
+    n = len(t)
+    ankle = np.tile([0.5, 0.88], (n, 1))
+    hip = np.column_stack([0.5 - 0.10 * p[:, 0], 0.525 + 0.17 * p[:, 0]])
+    shoulder = hip + np.column_stack([0.03 + 0.10 * p[:, 0], -0.27 + 0.05 * p[:, 0]])
+    wrist = shoulder + np.column_stack([0.20 * p[:, 0] + 0.02, 0.22 - 0.20 * p[:, 0]])
+    return _biped(hip, shoulder, ankle, wrist, wrist, knee_bend=-1.0, facing=1.0)
+
+
+def _pushup(t: np.ndarray) -> dict[str, np.ndarray]:
+    p = _phase(t, 2.0)[:, None]
+    n = len(t)
+    wrist = np.tile([0.32, 0.78], (n, 1))
+    ankle = np.tile([0.93, 0.72], (n, 1))
+    shoulder = np.column_stack([0.32 + 0.01 * p[:, 0], 0.56 + 0.10 * p[:, 0]])
+    hip = np.column_stack([np.full(n, 0.59), 0.62 + 0.07 * p[:, 0]])
+    # Clap push-ups: near the top of each rep the straight body pivots on the
+    # toes and the hands leave the floor, so the wrists rise with the shoulders.
+    lift = 0.2 * (1.0 - p[:, 0]) ** 4
+    shoulder, hip, wrist = (_pivot(joint, ankle, lift) for joint in (shoulder, hip, wrist))
+    return _biped(hip, shoulder, ankle, wrist, wrist, knee_bend=1.0, facing=-1.0, arm_bend=-1.0)
+
+
+def _pivot(point: np.ndarray, centre: np.ndarray, angle: np.ndarray) -> np.ndarray:
+    """`point` rotated by `angle` radians about `centre`; positive angles lift points left of the centre."""
+    d = point - centre
+    cos, sin = np.cos(angle), np.sin(angle)
+    return centre + np.column_stack([d[:, 0] * cos - d[:, 1] * sin, d[:, 0] * sin + d[:, 1] * cos])
+
+
+def _bowling(t: np.ndarray) -> dict[str, np.ndarray]:
+    period = 1.6
+    theta = 2.0 * np.pi * (t % period) / period
+    p = _phase(t, period)[:, None]
+    n = len(t)
+    hip = np.column_stack([0.48 + 0.03 * p[:, 0], 0.52 + 0.01 * p[:, 0]])
+    shoulder = hip + np.column_stack([0.02 * np.sin(theta), -0.28 + 0.02 * p[:, 0]])
+    reach = UPPER_ARM + FOREARM - 0.01
+    bowling_wrist = shoulder + reach * np.column_stack([np.sin(theta), -np.cos(theta)])
+    guide_wrist = shoulder + reach * np.column_stack([-0.5 * np.sin(theta), -0.6 - 0.2 * np.cos(theta)])
+    ankle = np.tile([0.48, 0.88], (n, 1))
+    return _biped(hip, shoulder, ankle, guide_wrist, bowling_wrist, knee_bend=-1.0, facing=1.0)
+
+
+def _cover_drive(t: np.ndarray) -> dict[str, np.ndarray]:
+    period = 2.0
+    u = (t % period) / period
+    n = len(t)
+    swing = np.clip((u - 0.2) / 0.6, 0.0, 1.0)
+    hip = np.column_stack([0.44 + 0.10 * swing, 0.54 + 0.03 * np.sin(np.pi * swing)])
+    shoulder = hip + np.column_stack([0.05 * swing - 0.01, -0.27 + 0.03 * np.sin(np.pi * swing)])
+    # Hands travel from the back-lift, down through the ball and up into the follow-through.
+    angle = np.pi * (0.85 - 1.3 * swing)
+    hands = shoulder + (UPPER_ARM + FOREARM - 0.02) * np.column_stack([np.cos(angle) * 0.9, np.sin(angle) * 0.9 + 0.35])
+    front_ankle = np.tile([0.62, 0.88], (n, 1))
+    points = _biped(hip, shoulder, front_ankle, hands - [0.01, 0.0], hands + [0.01, 0.0], knee_bend=-1.0, facing=1.0)
+    back_ankle = np.tile([0.36, 0.88], (n, 1))
+    points["left_knee"] = _two_link(hip, back_ankle, THIGH, SHIN, 1.0)
+    points["left_ankle"] = back_ankle
+    return points
+
+
+def _biped(
+    hip: np.ndarray,
+    shoulder: np.ndarray,
+    ankle: np.ndarray,
+    left_wrist: np.ndarray,
+    right_wrist: np.ndarray,
+    knee_bend: float,
+    facing: float,
+    arm_bend: float = 1.0,
+) -> dict[str, np.ndarray]:
+    """Side-view body with both sides a small x offset apart."""
+    half = np.array([0.012, 0.0])
+    knee = _two_link(hip, ankle, THIGH, SHIN, knee_bend)
+    points = {
+        "left_hip": hip - half,
+        "right_hip": hip + half,
+        "left_knee": knee - half,
+        "right_knee": knee + half,
+        "left_ankle": ankle - half,
+        "right_ankle": ankle + half,
+        "left_shoulder": shoulder - half,
+        "right_shoulder": shoulder + half,
+        "left_wrist": left_wrist,
+        "right_wrist": right_wrist,
+        "left_elbow": _two_link(shoulder - half, left_wrist, UPPER_ARM, FOREARM, arm_bend),
+        "right_elbow": _two_link(shoulder + half, right_wrist, UPPER_ARM, FOREARM, arm_bend),
+    }
+    _head(points, shoulder, facing)
+    return points
+
+
+GENERATORS: dict[str, Callable[[np.ndarray], dict[str, np.ndarray]]] = {
+    "squat": _squat,
+    "pushup": _pushup,
+    "bowling": _bowling,
+    "cricket_cover_drive": _cover_drive,
+}
+
+
+def generate_clip(
+    activity: str,
+    n_frames: int = 300,
+    fps: float = 30.0,
+    seed: int = 0,
+    noise: float = 0.003,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Synthetic (T, 17, 3) keypoints (x, y, score) and (T,) timestamps for one activity."""
+    rng = np.random.default_rng(seed)
+    timestamps = np.arange(n_frames, dtype=np.float64) / fps
+    joints = GENERATORS[activity](timestamps)
+
+    points = np.empty((n_frames, len(KEYPOINT_INDEX), 3), dtype=np.float64)
+    for name, idx in KEYPOINT_INDEX.items():
+        points[:, idx, :2] = joints[name]
+    points[:, :, :2] += rng.normal(0.0, noise, size=(n_frames, len(KEYPOINT_INDEX), 2))
+    np.clip(points[:, :, :2], 0.0, 1.0, out=points[:, :, :2])
+    points[:, :, 2] = rng.uniform(0.75, 0.99, size=(n_frames, len(KEYPOINT_INDEX)))
+    return points, timestamps
+
+
+def to_request_json(points: np.ndarray, timestamps: np.ndarray, activity_hint: str = "auto", fps: float = 30.0) -> bytes:
+    """Encode a clip as the `/api/analyze` JSON body."""
+    frames = [
+        {"timestamp": float(ts), "keypoints": [{"x": float(x), "y": float(y), "score": float(s)} for x, y, s in frame]}
+        for ts, frame in zip(timestamps, points)
+    ]
+    return json.dumps({"activity_hint": activity_hint, "fps": fps, "frames": frames}).encode()
+
+
+def to_packed(points: np.ndarray, timestamps: np.ndarray) -> bytes:
+    """Encode a clip as an `application/x-pose-f32` body."""
+    return np.concatenate([timestamps.astype("<f4"), points.astype("<f4").ravel()]).tobytes()
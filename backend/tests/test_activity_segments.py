@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.analysis.activity import activity_segments
+from app.analysis.features import series_to_lists
+from app.analysis.kinematics import series_from_array
+from bench.synthetic import GENERATORS, generate_clip
+
+
+def _series(activity: str, frames: int, fps: float, seed: int = 1) -> dict[str, list[float]]:
+    points, timestamps = generate_clip(activity, frames, fps, seed=seed)
+    return series_to_lists(series_from_array(points, timestamps))
+
+
+@pytest.mark.parametrize("claimed_fps", [0.0, 0.5, 7.3, 30.0, 1000.0])
+def test_single_activity_clip_is_one_segment_whatever_fps_is_claimed(claimed_fps: float) -> None:
+    series = _series("squat", 360, 30.0)
+    assert activity_segments(series, claimed_fps, "auto") == [("squat", 0, 360)]
+
+
+@pytest.mark.parametrize("activity", sorted(GENERATORS))
+@pytest.mark.parametrize("frames", [150, 300, 900])
+def test_synthetic_clip_is_detected_as_its_activity(activity: str, frames: int) -> None:
+    assert activity_segments(_series(activity, frames, 30.0), 30.0, "auto") == [(activity, 0, frames)]
+
+
+@pytest.mark.parametrize("fps", [5.0, 12.5])
+def test_low_frame_rate_clip_is_one_segment(fps: float) -> None:
+    series = _series("squat", int(12 * fps), fps)
+    assert len(activity_segments(series, fps, "auto")) == 1
+
+
+def test_mixed_clip_is_split() -> None:
+    squat, _ = generate_clip("squat", 450, 30.0, seed=2)
+    bowling, _ = generate_clip("bowling", 450, 30.0, seed=3)
+    series = series_to_lists(series_from_array(np.concatenate([squat, bowling]), np.arange(900) / 30.0))
+    segments = activity_segments(series, 30.0, "auto")
+    assert [s[0] for s in segments][0] == "squat" and segments[-1][0] == "bowling"
+    assert segments[0][1] == 0 and segments[-1][2] == 900
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from pathlib import Path
+
+from app.cache import SqliteStore, TTLCache
+
+
+def _rows(path: Path, table: str) -> list[str]:
+    with sqlite3.connect(path) as conn:
+        return [key for (key,) in conn.execute(f"SELECT key FROM {table} ORDER BY created_at")]
+
+
+def test_expired_row_is_deleted_on_read(tmp_path: Path) -> None:
+    path = tmp_path / "cache.sqlite"
+    store = SqliteStore(path, "entries", ttl_s=60.0)
+    store.set("old", {"v": 1}, time.time() - 120.0)
+    store.set("new", {"v": 2}, time.time())
+    assert store.get("old") is None
+    assert store.get("new")[0] == {"v": 2}
+    assert _rows(path, "entries") == ["new"]
+
+
+def test_sweep_drops_expired_rows_and_caps_the_table(tmp_path: Path) -> None:
+    path = tmp_path / "cache.sqlite"
+    store = SqliteStore(path, "entries", ttl_s=60.0, max_rows=10, sweep_every=5)
+    now = time.time()
+    for i in range(3):
+        store.set(f"stale{i}", i, now - 600.0)
+    for i in range(22):
+        store.set(f"k{i:02d}", i, now + i)
+        assert len(_rows(path, "entries")) <= 10 + store.sweep_every - 1
+    store.sweep()
+    assert _rows(path, "entries") == [f"k{i:02d}" for i in range(12, 22)]
+
+
+def test_reopening_sweeps_the_existing_file(tmp_path: Path) -> None:
+    path = tmp_path / "cache.sqlite"
+    store = SqliteStore(path, "entries")
+    now = time.time()
+    for i in range(20):
+        store.set(f"k{i:02d}", i, now - 1000.0 + i)
+    SqliteStore(path, "entries", ttl_s=3600.0, max_rows=5)
+    assert _rows(path, "entries") == [f"k{i:02d}" for i in range(15, 20)]
+
+
+def test_ttl_cache_misses_on_expired_store_rows(tmp_path: Path) -> None:
+    path = tmp_path / "cache.sqlite"
+    store = SqliteStore(path, "entries", ttl_s=60.0)
+    store.set("key", "stale", time.time() - 120.0)
+    cache = TTLCache(max_entries=4, ttl_s=60.0, store=store)
+    assert cache.get("key") is None
+    assert _rows(path, "entries") == []
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+import numpy as np
+
+from app.analysis.cricket_cnn_inference import InferenceBatcher
+
+
+class _RecordingPredictor:
+    """Stands in for the CNN: labels each sequence by its id and records every forward pass."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[int]] = []
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self) -> bool:
+        return True
+
+    def predict_pose_sequences(self, sequences: list[np.ndarray]) -> list[Optional[dict[str, Any]]]:
+        with self._lock:
+            self.batches.append([len(seq) for seq in sequences])
+        time.sleep(0.01)  # long enough for the next submits to queue up
+        return [{"label": str(int(seq[0, 0, 0])), "frames": len(seq)} for seq in sequences]
+
+
+def _sequence(seq_id: int, frames: int) -> np.ndarray:
+    return np.full((frames, 17, 2), float(seq_id), dtype=np.float32)
+
+
+def _batcher(predictor: _RecordingPredictor, max_batch_size: int) -> InferenceBatcher:
+    batcher = InferenceBatcher(predictor)  # type: ignore[arg-type]
+    batcher.max_batch_size = max_batch_size
+    batcher.max_wait_ms = 20.0
+    batcher.enabled = True
+    return batcher
+
+
+def test_concurrent_submits_get_their_own_results() -> None:
+    predictor = _RecordingPredictor()
+    batcher = _batcher(predictor, max_batch_size=16)
+    sizes = [7, 3, 7, 5, 1, 7, 6, 2, 7, 4] * 4
+
+    with ThreadPoolExecutor(max_workers=len(sizes)) as pool:
+        results = list(pool.map(lambda i: batcher.submit(_sequence(i, sizes[i])), range(len(sizes))))
+
+    assert [r["label"] for r in results] == [str(i) for i in range(len(sizes))]
+    assert [r["frames"] for r in results] == sizes
+    assert sorted(n for batch in predictor.batches for n in batch) == sorted(sizes)
+    assert any(len(batch) > 1 for batch in predictor.batches)
+    assert all(sum(batch) <= 16 for batch in predictor.batches)
+    stats = batcher.stats()
+    assert stats["sequences"] == len(sizes)
+    assert stats["images"] == sum(sizes)
+    assert max(int(n) for n in stats["batch_size_counts"]) <= 16
+
+
+def test_sequence_over_the_limit_runs_alone() -> None:
+    predictor = _RecordingPredictor()
+    batcher = _batcher(predictor, max_batch_size=8)
+    sizes = [5, 12, 5, 5]
+
+    with ThreadPoolExecutor(max_workers=len(sizes)) as pool:
+        results = list(pool.map(lambda i: batcher.submit(_sequence(i, sizes[i])), range(len(sizes))))
+
+    assert [r["label"] for r in results] == ["0", "1", "2", "3"]
+    assert [12] in predictor.batches
+    assert all(sum(batch) <= 8 for batch in predictor.batches if batch != [12])
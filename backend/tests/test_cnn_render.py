@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.analysis.cricket_cnn_inference import rasterize_poses, render_pose_to_image
+from app.schemas import FramePose
+from bench.synthetic import generate_clip
+
+MEAN = (0.485, 0.456, 0.406)
+STD = (0.229, 0.224, 0.225)
+
+
+def _poses() -> np.ndarray:
+    rng = np.random.default_rng(11)
+    clip, _ = generate_clip("cricket_cover_drive", 60, 30.0, seed=5)
+    poses = [clip[::6, :, :2], rng.uniform(-0.1, 1.1, (12, 17, 2))]
+    collapsed = clip[:2, :, :2].copy()
+    collapsed[:, 5:11] = collapsed[:, 5:6]  # coincident joints: zero-length edges
+    edge_hugging = rng.uniform(0.0, 0.01, (2, 17, 2))  # discs and lines cut by the border
+    return np.concatenate(poses + [collapsed, edge_hugging]).astype(np.float32)
+
+
+def _pil_tensor(pose: np.ndarray) -> np.ndarray:
+    frame = FramePose(timestamp=0.0, keypoints=[{"x": float(x), "y": float(y), "score": 1.0} for x, y in pose])
+    image = np.asarray(render_pose_to_image(frame), dtype=np.float32) / 255.0
+    return ((image - np.asarray(MEAN, dtype=np.float32)) / np.asarray(STD, dtype=np.float32)).transpose(2, 0, 1)
+
+
+def test_pose_renders_the_same_alone_and_in_a_batch() -> None:
+    poses = _poses()
+    batch = rasterize_poses(poses)
+    for i, pose in enumerate(poses):
+        np.testing.assert_array_equal(rasterize_poses(pose[None])[0], batch[i], err_msg=f"pose {i}")
+        np.testing.assert_array_equal(rasterize_poses(np.stack([poses[-1], pose]))[1], batch[i], err_msg=f"pose {i}")
+
+
+def test_matches_pil_renderer() -> None:
+    pytest.importorskip("PIL")
+    poses = _poses()
+    batch = rasterize_poses(poses, 224, MEAN, STD)
+    for i, pose in enumerate(poses):
+        np.testing.assert_allclose(batch[i], _pil_tensor(pose), rtol=0, atol=1e-5, err_msg=f"pose {i}")
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.analysis.features import series_to_lists
+from app.analysis.kinematics import series_from_array
+from app.compact import DEFAULT_COMPACT_SERIES, compact_timeline, lttb_indices
+from bench.synthetic import generate_clip
+
+FPS = 30.0
+
+
+def _reference_lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> list[int]:
+    """Textbook one-series LTTB, bucket by bucket."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return list(range(n))
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    out, prev = [0], 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+        area = np.abs((x[prev] - cx) * (y[lo:hi] - y[prev]) - (x[prev] - x[lo:hi]) * (cy - y[prev]))
+        prev = lo + int(area.argmax())
+        out.append(prev)
+    return out + [n - 1]
+
+
+def _series(frames: int) -> dict[str, list[float]]:
+    points, timestamps = generate_clip("squat", frames, FPS, seed=3, noise=0.01)
+    return series_to_lists(series_from_array(points, timestamps))
+
+
+@pytest.mark.parametrize(("n", "n_out"), [(10, 3), (100, 7), (1000, 50), (1001, 1000), (2500, 333)])
+def test_lttb_matches_reference_per_series(n: int, n_out: int) -> None:
+    rng = np.random.default_rng(n)
+    x = np.sort(rng.uniform(0.0, 60.0, n))
+    ys = rng.normal(size=(3, n)).cumsum(axis=1)
+    picks = lttb_indices(x, ys, n_out)
+    assert picks.shape == (3, n_out)
+    for y, row in zip(ys, picks):
+        assert row.tolist() == _reference_lttb(x, y, n_out)
+        assert lttb_indices(x, y, n_out).tolist() == row.tolist()
+
+
+def test_short_clip_is_returned_whole() -> None:
+    series = _series(300)
+    out = compact_timeline(series, max_points=300)
+    assert list(out) == ["timestamps", *DEFAULT_COMPACT_SERIES]
+    assert out["timestamps"] == np.round(series["timestamps"], 4).tolist()
+    for name in DEFAULT_COMPACT_SERIES:
+        assert out[name] == np.round(series[name], 4).tolist()
+
+
+@pytest.mark.parametrize(("names", "max_points"), [(None, 500), (["avg_knee"], 120), (["hip_y", "trunk"], 7), ([], 64)])
+def test_long_clip_stays_within_the_budget(names, max_points: int) -> None:
+    series = _series(3000)
+    out = compact_timeline(series, names, max_points)
+    t = out["timestamps"]
+    assert len(t) <= max_points
+    assert t[0] == round(series["timestamps"][0], 4) and t[-1] == round(series["timestamps"][-1], 4)
+    assert t == sorted(set(t))
+    assert all(len(out[name]) == len(t) for name in out)
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pytest
+
+from app.analysis.constants import KEYPOINT_INDEX
+from app.analysis.features import extract_common_series
+from app.analysis.kinematics import frames_to_array, joint_angles, midpoints, series_from_array
+from app.schemas import FramePose
+from bench.synthetic import generate_clip
+
+# Parity of the vectorized engine with the original per-frame scalar path,
+# kept here as the reference implementation.
+
+
+def _angle_abc(a: tuple[float, float], b: tuple[float, float], c: tuple[float, float]) -> float:
+    ab = (a[0] - b[0], a[1] - b[1])
+    cb = (c[0] - b[0], c[1] - b[1])
+    dot = ab[0] * cb[0] + ab[1] * cb[1]
+    mag_ab = math.hypot(*ab)
+    mag_cb = math.hypot(*cb)
+    if mag_ab == 0 or mag_cb == 0:
+        return 180.0
+    cosine = max(-1.0, min(1.0, dot / (mag_ab * mag_cb)))
+    return math.degrees(math.acos(cosine))
+
+
+def _point(frame: FramePose, name: str) -> tuple[float, float]:
+    kp = frame.keypoints[KEYPOINT_INDEX[name]]
+    return kp.x, kp.y
+
+
+def _joint_angle(frame: FramePose, a: str, b: str, c: str) -> float:
+    return _angle_abc(_point(frame, a), _point(frame, b), _point(frame, c))
+
+
+def _midpoint(frame: FramePose, left: str, right: str) -> tuple[float, float]:
+    (lx, ly), (rx, ry) = _point(frame, left), _point(frame, right)
+    return (lx + rx) / 2.0, (ly + ry) / 2.0
+
+
+def _derivative(values: list[float], timestamps: list[float]) -> list[float]:
+    out = [0.0]
+    for i in range(1, len(values)):
+        out.append((values[i] - values[i - 1]) / max(timestamps[i] - timestamps[i - 1], 1e-6))
+    return out
+
+
+def _scalar_series(frames: list[FramePose]) -> dict[str, list[float]]:
+    timestamps = [f.timestamp for f in frames]
+    left_knee = [_joint_angle(f, "left_hip", "left_knee", "left_ankle") for f in frames]
+    right_knee = [_joint_angle(f, "right_hip", "right_knee", "right_ankle") for f in frames]
+    hip_y = [_midpoint(f, "left_hip", "right_hip")[1] for f in frames]
+    hip_velocity = _derivative(hip_y, timestamps)
+    return {
+        "timestamps": timestamps,
+        "left_knee": left_knee,
+        "right_knee": right_knee,
+        "avg_knee": [(l + r) / 2.0 for l, r in zip(left_knee, right_knee)],
+        "trunk": [_joint_angle(f, "left_shoulder", "left_hip", "left_knee") for f in frames],
+        "nose_x": [f.keypoints[0].x for f in frames],
+        "hip_y": hip_y,
+        "hip_x": [_midpoint(f, "left_hip", "right_hip")[0] for f in frames],
+        "wrist_x": [_midpoint(f, "left_wrist", "right_wrist")[0] for f in frames],
+        "wrist_y": [_midpoint(f, "left_wrist", "right_wrist")[1] for f in frames],
+        "shoulder_y": [_midpoint(f, "left_shoulder", "right_shoulder")[1] for f in frames],
+        "left_elbow": [_joint_angle(f, "left_shoulder", "left_elbow", "left_wrist") for f in frames],
+        "right_elbow": [_joint_angle(f, "right_shoulder", "right_elbow", "right_wrist") for f in frames],
+        "hip_velocity": hip_velocity,
+        "hip_acceleration": _derivative(hip_velocity, timestamps),
+    }
+
+
+def _frames(points: np.ndarray, timestamps: np.ndarray) -> list[FramePose]:
+    return [
+        FramePose(timestamp=float(ts), keypoints=[{"x": x, "y": y, "score": s} for x, y, s in frame])
+        for ts, frame in zip(timestamps, points)
+    ]
+
+
+def _degenerate_clip() -> tuple[np.ndarray, np.ndarray]:
+    points, timestamps = generate_clip("squat", 40, 30.0, seed=3)
+    left_knee, left_hip, left_ankle = (KEYPOINT_INDEX[k] for k in ("left_knee", "left_hip", "left_ankle"))
+    points[0:5, left_knee, :2] = points[0:5, left_hip, :2]  # zero-length thigh
+    points[5:10, left_ankle, :2] = points[5:10, left_knee, :2]  # zero-length shin
+    points[10:15, :, :] = 0.0  # every joint missing, reported at the origin
+    points[15:20, KEYPOINT_INDEX["right_elbow"], :2] = 0.0  # one missing joint
+    points[20:25, left_knee, 0] = np.nan
+    points[25:28, KEYPOINT_INDEX["right_wrist"], :2] = np.nan
+    points[28:30, left_hip, 1] = np.nan
+    # Collinear limbs: cosine rounding past +/-1 must clamp.
+    points[30:32, left_knee, :2] = (points[30:32, left_hip, :2] + points[30:32, left_ankle, :2]) / 2.0
+    timestamps[33] = timestamps[32]  # repeated timestamp
+    return points, timestamps
+
+
+@pytest.mark.parametrize("activity", ["squat", "pushup", "bowling", "cricket_cover_drive"])
+def test_series_matches_scalar_path(activity: str) -> None:
+    frames = _frames(*generate_clip(activity, 120, 30.0, seed=7))
+    _assert_series_equal(extract_common_series(frames), _scalar_series(frames))
+
+
+def test_degenerate_input_matches_scalar_path() -> None:
+    frames = _frames(*_degenerate_clip())
+    _assert_series_equal(extract_common_series(frames), _scalar_series(frames))
+
+
+def test_joint_angles_and_midpoints_match_scalar_helpers() -> None:
+    points, timestamps = _degenerate_clip()
+    frames = _frames(points, timestamps)
+    packed, _ = frames_to_array(frames)
+    for joints in [("left_hip", "left_knee", "left_ankle"), ("right_shoulder", "right_elbow", "right_wrist")]:
+        expected = [_joint_angle(f, *joints) for f in frames]
+        np.testing.assert_allclose(joint_angles(packed, *joints), expected, rtol=1e-12, atol=1e-9, equal_nan=True)
+    expected_mid = [_midpoint(f, "left_hip", "right_hip") for f in frames]
+    np.testing.assert_array_equal(midpoints(packed, "left_hip", "right_hip"), expected_mid)
+    assert set(series_from_array(packed, timestamps)) == set(_scalar_series(frames))
+
+
+def _assert_series_equal(actual: dict[str, list[float]], expected: dict[str, list[float]]) -> None:
+    assert set(actual) == set(expected)
+    for key, values in expected.items():
+        np.testing.assert_allclose(actual[key], values, rtol=1e-12, atol=1e-9, equal_nan=True, err_msg=key)
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import copy
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+from starlette.concurrency import run_in_threadpool
+
+import app.analysis.reference_library as reference_library
+from app.analysis.reference_library import (
+    REFERENCE_LIBRARY,
+    current_reference,
+    library_version,
+    pin_reference,
+    reference_status,
+    reload_reference,
+)
+from app.analysis.scoring import score_activity
+
+FEATURES = {
+    "depth_ratio": 0.9,
+    "min_knee_angle": 100.0,
+    "trunk_angle_bottom": 40.0,
+    "knee_symmetry": 3.0,
+    "head_stability": 0.01,
+}
+
+
+@pytest.fixture
+def library_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """A reference file the module watches, with the built-in snapshot restored afterwards."""
+    path = tmp_path / "reference.json"
+    monkeypatch.setattr(reference_library, "REFERENCE_LIBRARY_PATH", str(path))
+    monkeypatch.setattr(reference_library, "_CURRENT", reference_library._CURRENT)
+    monkeypatch.setattr(reference_library, "_RELOAD_STATE", {"file_stat": None, "last_error": None, "watcher": False})
+    return path
+
+
+def _write(path: Path, library: Any) -> None:
+    # Bump the mtime explicitly: two writes within the filesystem's timestamp resolution look unchanged.
+    previous = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(json.dumps(library) if not isinstance(library, str) else library, encoding="utf-8")
+    os.utime(path, ns=(previous + 10**9, previous + 10**9))
+
+
+def _edited(min_knee: tuple[float, float]) -> dict[str, Any]:
+    library = copy.deepcopy(REFERENCE_LIBRARY)
+    library["squat"]["targets"]["min_knee_angle"] = list(min_knee)
+    return library
+
+
+def test_reload_installs_a_changed_file(library_file: Path) -> None:
+    builtin = current_reference()
+    _write(library_file, _edited((60.0, 80.0)))
+
+    assert reload_reference() is True
+    snapshot = current_reference()
+    assert snapshot.version != builtin.version
+    assert snapshot.version == library_version(snapshot.library)
+    assert snapshot.library["squat"]["targets"]["min_knee_angle"] == (60.0, 80.0)
+    assert snapshot.source == str(library_file)
+    assert reference_status()["version"] == snapshot.version
+
+    # Unchanged file: skipped. Same content rewritten: parsed, but the version is kept.
+    assert reload_reference() is False
+    _write(library_file, _edited((60.0, 80.0)))
+    assert reload_reference() is False
+    assert current_reference() is snapshot
+
+    _write(library_file, _edited((65.0, 85.0)))
+    assert reload_reference() is True
+    assert current_reference().library["squat"]["targets"]["min_knee_angle"] == (65.0, 85.0)
+
+
+@pytest.mark.parametrize(
+    ("content", "error"),
+    [
+        ("{not json", "JSONDecodeError"),
+        (_edited((90.0, 80.0)), "squat.targets.min_knee_angle: target min 90.0 exceeds max 80.0"),
+        ({**_edited((60.0, 80.0)), "pushup": "flat"}, "pushup: expected an object"),
+        ({k: v for k, v in REFERENCE_LIBRARY.items() if k != "bowling"}, "library: expected activities"),
+    ],
+)
+def test_invalid_library_is_rejected_and_the_current_one_kept(library_file: Path, content: Any, error: str) -> None:
+    before = current_reference()
+    _write(library_file, content)
+
+    assert reload_reference() is False
+    assert current_reference() is before
+    assert error in reference_status()["last_error"]
+
+    # Fixing the file is picked up on the next poll and clears the error.
+    _write(library_file, _edited((60.0, 80.0)))
+    assert reload_reference() is True
+    assert reference_status()["last_error"] is None
+
+
+def test_pinned_snapshot_stays_fixed_for_the_request(library_file: Path) -> None:
+    _write(library_file, _edited((60.0, 80.0)))
+    reload_reference()
+
+    async def request() -> tuple[str, tuple[float, list], tuple[float, list]]:
+        pinned = pin_reference()
+        before = score_activity("squat", FEATURES)
+        # A reload lands while the request is still running...
+        _write(library_file, _edited((100.0, 120.0)))
+        assert reload_reference() is True
+        # ...but the request, and the threads it hands work to, keep scoring with its pinned version.
+        after = await run_in_threadpool(score_activity, "squat", FEATURES)
+        assert current_reference() is pinned
+        return pinned.version, before, after
+
+    version, before, after = contextvars.copy_context().run(asyncio.run, request())
+    assert before == after
+    assert before[1][1].target_min == 60.0
+
+    # A new request pins the reloaded library.
+    assert current_reference().version != version
+    fresh = contextvars.copy_context().run(lambda: (pin_reference(), score_activity("squat", FEATURES))[1])
+    assert fresh[1][1].target_min == 100.0
+    assert fresh != before
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.analysis.features import series_to_lists
+from app.analysis.kinematics import series_from_array
+from app.analysis.reps import rep_signal, rep_summary, segment_reps
+from bench.synthetic import generate_clip
+
+FPS = 30.0
+PERIOD = 60  # frames per rep
+
+
+def _reps(n_reps: float, phase: float = 0.0) -> np.ndarray:
+    """0 at rest, 1 at the bottom of each rep, starting `phase` of a rep in."""
+    t = np.arange(int(round(n_reps * PERIOD)) + 1) / PERIOD + phase
+    return (1.0 - np.cos(2.0 * np.pi * t)) / 2.0
+
+
+def test_counts_clean_reps_with_bounds_at_the_troughs() -> None:
+    reps = segment_reps(_reps(5).tolist())
+    assert len(reps) == 5
+    for k, (start, end) in enumerate(reps):
+        assert abs(start - k * PERIOD) <= 1
+        assert abs(end - (k + 1) * PERIOD) <= 1
+
+
+@pytest.mark.parametrize("activity", ["squat", "pushup"])
+def test_rep_count_on_synthetic_clip(activity: str) -> None:
+    # 2.4 s squat and 2.0 s push-up cycles.
+    seconds = 12.0
+    points, timestamps = generate_clip(activity, int(seconds * FPS) + 1, FPS, seed=9, noise=0.004)
+    series = series_to_lists(series_from_array(points, timestamps))
+    summary = rep_summary(activity, series, FPS)
+    expected = int(seconds / (2.4 if activity == "squat" else 2.0))
+    assert summary is not None and summary.count == expected
+    assert [r.index for r in summary.reps] == list(range(expected))
+    assert len(segment_reps(rep_signal(activity, series))) == expected
+
+
+def test_noise_below_the_band_adds_no_reps() -> None:
+    rng = np.random.default_rng(0)
+    signal = _reps(4)
+    # Jitter everywhere, plus slow wobbles at rest reaching 25% of the range (the band is 30%).
+    noisy = signal + rng.uniform(-0.02, 0.02, signal.shape)
+    rest = signal < 0.05
+    wobble = 0.25 * np.abs(np.sin(np.arange(len(signal)) * np.pi / 7))
+    assert len(segment_reps((noisy + np.where(rest, wobble, 0.0)).tolist())) == 4
+
+
+def test_bump_just_over_the_band_is_a_rep_and_just_under_is_not() -> None:
+    rest = np.zeros(20)
+
+    def bump(height: float) -> np.ndarray:
+        return height * (1.0 - np.cos(2.0 * np.pi * np.arange(PERIOD + 1) / PERIOD)) / 2.0
+
+    full = _reps(1)
+    for height, expected in [(0.27, 2), (0.33, 3)]:
+        signal = np.concatenate([full, rest, bump(height), rest, full])
+        assert len(segment_reps(signal.tolist())) == expected, height
+
+
+@pytest.mark.parametrize("extra", [0.25, 0.5, 0.6])
+def test_partial_final_rep_is_not_counted(extra: float) -> None:
+    # Cut off on the way down, at the bottom, or before coming back up past the band.
+    assert len(segment_reps(_reps(3 + extra).tolist())) == 3
+
+
+def test_final_rep_counts_once_it_returns_past_the_band() -> None:
+    assert len(segment_reps(_reps(3.85).tolist())) == 4
+
+
+def test_degenerate_signals() -> None:
+    assert segment_reps([]) == []
+    assert segment_reps([0.5]) == []
+    assert segment_reps([0.5] * 100) == []
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from typing import Any, Mapping
+
+import numpy as np
+import pytest
+
+from app.analysis.reference_library import REFERENCE_LIBRARY
+from app.analysis.scoring import (
+    apply_overrides,
+    compile_reference,
+    score_activity,
+    score_feature_rows,
+    score_matrix,
+    stack_references,
+)
+
+# The per-metric scorer the vectorized paths replaced, kept as the reference.
+
+
+def _metric_score(value: float, lo: float, hi: float) -> tuple[float, float]:
+    if lo <= value <= hi:
+        return 0.0, 100.0
+    deviation = min(abs(value - lo), abs(value - hi))
+    width = max(hi - lo, 1e-6)
+    penalty = (deviation / width) * 100.0
+    return deviation, max(0.0, 100.0 - penalty)
+
+
+def _scalar_score(library: Mapping[str, Any], activity: str, features: dict[str, float]) -> tuple[float, list[dict]]:
+    targets = library[activity]["targets"]
+    weights = library[activity]["weights"]
+    metrics = []
+    weighted_sum = 0.0
+    total_weight = 0.0
+    for name, value in features.items():
+        lo, hi = targets[name]
+        deviation, score = _metric_score(value, lo, hi)
+        weighted_sum += score * weights[name]
+        total_weight += weights[name]
+        metrics.append(
+            {
+                "name": name,
+                "value": round(value, 4),
+                "target_min": lo,
+                "target_max": hi,
+                "deviation": round(deviation, 4),
+                "score": round(score, 2),
+            }
+        )
+    return weighted_sum / max(total_weight, 1e-6), metrics
+
+
+def _feature_rows(library: Mapping[str, Any], activity: str, n: int = 200, seed: int = 0) -> list[dict[str, float]]:
+    """Values inside, on the edges of, just outside and far outside every target range."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n):
+        row = {}
+        for name, (lo, hi) in library[activity]["targets"].items():
+            width = hi - lo
+            if i % 10 == 0:
+                row[name] = float(lo if i % 20 == 0 else hi)
+            else:
+                row[name] = float(lo + width * rng.uniform(-2.5, 3.5))
+        rows.append(row)
+    return rows
+
+
+OVERRIDES = {
+    "squat": {"targets": {"min_knee_angle": [60.0, 95.0]}, "weights": {"depth_ratio": 0.5}},
+    "bowling": {"targets": {"release_height_index": [0.3, 0.9]}},
+}
+
+
+@pytest.mark.parametrize("activity", sorted(REFERENCE_LIBRARY))
+def test_score_feature_rows_matches_scalar_scorer(activity: str) -> None:
+    rows = _feature_rows(REFERENCE_LIBRARY, activity)
+    for row, (overall, metrics) in zip(rows, score_feature_rows(activity, rows)):
+        expected_overall, expected_metrics = _scalar_score(REFERENCE_LIBRARY, activity, row)
+        assert overall == round(expected_overall, 2)
+        assert [m.model_dump() for m in metrics] == expected_metrics
+        overall_single, metrics_single = score_activity(activity, row)
+        assert overall_single == overall
+        assert metrics_single == metrics
+
+
+@pytest.mark.parametrize("activity", sorted(REFERENCE_LIBRARY))
+def test_score_matrix_matches_scalar_scorer_unrounded(activity: str) -> None:
+    rows = _feature_rows(REFERENCE_LIBRARY, activity, seed=1)
+    ref = compile_reference(REFERENCE_LIBRARY)[activity]
+    values = np.array([[row[m] for m in ref.metrics] for row in rows])
+    overall, _, _ = score_matrix(values, ref.lo, ref.hi, ref.weights)
+    assert overall.tolist() == [_scalar_score(REFERENCE_LIBRARY, activity, row)[0] for row in rows]
+
+
+def test_apply_overrides_copies_and_merges() -> None:
+    merged = apply_overrides(OVERRIDES, REFERENCE_LIBRARY)
+    assert merged["squat"]["targets"]["min_knee_angle"] == (60.0, 95.0)
+    assert merged["squat"]["weights"]["depth_ratio"] == 0.5
+    assert merged["squat"]["targets"]["depth_ratio"] == REFERENCE_LIBRARY["squat"]["targets"]["depth_ratio"]
+    assert merged["pushup"] == REFERENCE_LIBRARY["pushup"]
+    assert REFERENCE_LIBRARY["squat"]["targets"]["min_knee_angle"] != (60.0, 95.0)
+    assert REFERENCE_LIBRARY["squat"]["weights"]["depth_ratio"] != 0.5
+
+
+@pytest.mark.parametrize("activity", ["squat", "bowling"])
+def test_stacked_references_match_scalar_scorer_per_library(activity: str) -> None:
+    libraries = [REFERENCE_LIBRARY, apply_overrides(OVERRIDES, REFERENCE_LIBRARY)]
+    rows = _feature_rows(REFERENCE_LIBRARY, activity, seed=2)
+    # A reordered metric list exercises the index mapping in stack_references.
+    metrics = list(reversed(REFERENCE_LIBRARY[activity]["targets"]))
+    lo, hi, weights = stack_references([compile_reference(lib) for lib in libraries], activity, metrics)
+    assert lo.shape == hi.shape == weights.shape == (2, len(metrics))
+
+    values = np.array([[row[m] for m in metrics] for row in rows])
+    overall, deviation, scores = score_matrix(values, lo, hi, weights)
+    assert overall.shape == (2, len(rows))
+    for r, library in enumerate(libraries):
+        for i, row in enumerate(rows):
+            expected_overall, expected_metrics = _scalar_score(library, activity, {m: row[m] for m in metrics})
+            assert overall[r, i] == expected_overall
+            assert [round(float(d), 4) for d in deviation[r, i]] == [m["deviation"] for m in expected_metrics]
+            assert [round(float(s), 2) for s in scores[r, i]] == [m["score"] for m in expected_metrics]
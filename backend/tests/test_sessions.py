@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import statistics
+from pathlib import Path
+
+import pytest
+
+import app.sessions as sessions
+from app.schemas import AnalysisResponse, BiomechanicsSummary, MetricResult
+from app.sessions import OVERALL, SessionStore
+
+
+def _response(score: float, activity: str = "squat") -> AnalysisResponse:
+    metric = MetricResult(
+        name="min_knee_angle", value=80.0 + score / 10, target_min=70.0, target_max=100.0, deviation=0.0, score=score
+    )
+    return AnalysisResponse(
+        activity=activity,
+        overall_score=score,
+        metrics=[metric],
+        feedback=[],
+        coaching_explanations=[],
+        timeline={"timestamps": [0.0, 1.0]},
+        kinematics_stream=[],
+        biomechanics=BiomechanicsSummary(
+            force_estimate_n=0.0,
+            torque_estimate_nm=0.0,
+            momentum_estimate=0.0,
+            power_estimate_w=0.0,
+            balance_index=0.0,
+            stability_score=100.0,
+        ),
+        joint_assessment={},
+        reference_version="test",
+    )
+
+
+SCORES = [40.0, 90.0, 55.0, 70.0, 100.0, 10.0, 65.0, 85.0, 30.0, 75.0, 50.0, 95.0]
+
+
+def _check_rolling(store: SessionStore, user: str, scores: list[float]) -> None:
+    points = store.trends(user, "squat", OVERALL)[OVERALL]
+    assert [p["score"] for p in points] == scores
+    for i, point in enumerate(points):
+        expected = statistics.fmean(scores[max(0, i + 1 - store.window) : i + 1])
+        assert point["rolling_score"] == pytest.approx(expected, abs=1e-9), i
+
+    (agg,) = [a for a in store.aggregates(user, "squat") if a["metric"] == OVERALL]
+    assert agg["count"] == len(scores)
+    assert agg["rolling_score"] == pytest.approx(statistics.fmean(scores[-store.window :]), abs=1e-9)
+    assert agg["mean_score"] == pytest.approx(statistics.fmean(scores), abs=1e-9)
+    assert agg["best_score"] == max(scores)
+
+
+@pytest.mark.parametrize("window", [1, 3, 5])
+def test_rolling_score_over_more_sessions_than_the_window(tmp_path: Path, window: int) -> None:
+    store = SessionStore(tmp_path / "sessions.sqlite", window=window)
+    for i, score in enumerate(SCORES):
+        assert store.save("u1", f"upload-{i}", _response(score)) is not None
+    _check_rolling(store, "u1", SCORES)
+
+
+def test_rolling_score_with_sessions_saved_in_the_same_clock_tick(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(sessions.time, "time", lambda: 1_700_000_000.0)
+    store = SessionStore(tmp_path / "sessions.sqlite", window=3)
+    for i, score in enumerate(SCORES):
+        store.save("u1", f"upload-{i}", _response(score))
+    _check_rolling(store, "u1", SCORES)
+
+
+def test_rolling_score_is_per_user_and_activity(tmp_path: Path) -> None:
+    store = SessionStore(tmp_path / "sessions.sqlite", window=3)
+    for i, score in enumerate(SCORES):
+        store.save("u1", f"upload-{i}", _response(score))
+        store.save("u2", f"upload-{i}", _response(100.0 - score))
+        store.save("u1", f"pushup-{i}", _response(score / 2, activity="pushup"))
+    _check_rolling(store, "u1", SCORES)
+    _check_rolling(store, "u2", [100.0 - s for s in SCORES])
+
+
+def test_duplicate_upload_is_ignored(tmp_path: Path) -> None:
+    store = SessionStore(tmp_path / "sessions.sqlite", window=3)
+    for i, score in enumerate(SCORES[:4]):
+        store.save("u1", f"upload-{i}", _response(score))
+    before = (store.sessions("u1"), store.trends("u1", "squat"), store.aggregates("u1"))
+
+    assert store.save("u1", "upload-2", _response(0.0)) is None
+    assert (store.sessions("u1"), store.trends("u1", "squat"), store.aggregates("u1")) == before
+
+    # The same upload from another user is a separate session.
+    assert store.save("u2", "upload-2", _response(0.0)) is not None
+    assert len(store.sessions("u2")) == 1
+    store.save("u1", "upload-4", _response(SCORES[4]))
+    _check_rolling(store, "u1", SCORES[:5])
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+import pytest
+
+from app.analysis.accumulators import ActivityDetectorAccumulator, feature_accumulator
+from app.analysis.activity import classify_activity, detect_activity_from_series
+from app.analysis.biomechanics import biomechanics_summary
+from app.analysis.features import activity_features_from_series, series_to_lists
+from app.analysis.kinematics import series_from_array
+from app.analysis.scoring import score_activity
+from app.analysis.streaming import LiveSession, StreamingSeries
+from bench.synthetic import generate_clip
+
+# The live path folds one frame at a time into running state; on the same clip
+# it must report what the batch functions compute over the whole series (or
+# over the last `window` rows of it).
+
+ACTIVITIES = ["squat", "pushup", "bowling", "cricket_cover_drive"]
+FPS = 30.0
+
+
+def _clip(activity: str, frames: int = 240, seed: int = 4) -> tuple[np.ndarray, np.ndarray]:
+    return generate_clip(activity, frames, FPS, seed=seed, noise=0.01)
+
+
+def _streamed(points: np.ndarray, timestamps: np.ndarray, window: Optional[int] = None) -> StreamingSeries:
+    stream = StreamingSeries(window)
+    for frame, ts in zip(points, timestamps):
+        stream.push(frame, float(ts))
+    return stream
+
+
+def _rows(series: dict[str, list[float]]) -> list[dict[str, float]]:
+    return [dict(zip(series, values)) for values in zip(*series.values())]
+
+
+def _tail(series: dict[str, list[float]], n: int) -> dict[str, list[float]]:
+    return {k: v[-n:] for k, v in series.items()}
+
+
+def _assert_features_close(actual: dict[str, float], expected: dict[str, float]) -> None:
+    assert set(actual) == set(expected)
+    for key, value in expected.items():
+        assert actual[key] == pytest.approx(value, rel=1e-9, abs=1e-9), key
+
+
+@pytest.mark.parametrize("activity", ACTIVITIES)
+def test_streamed_series_and_biomechanics_match_batch(activity: str) -> None:
+    points, timestamps = _clip(activity)
+    batch = series_to_lists(series_from_array(points, timestamps))
+    streamed = _streamed(points, timestamps).as_lists()
+
+    assert set(streamed) == set(batch)
+    for key, values in batch.items():
+        np.testing.assert_allclose(streamed[key], values, rtol=1e-9, atol=1e-9, err_msg=key)
+    assert biomechanics_summary(activity, streamed) == biomechanics_summary(activity, batch)
+
+
+@pytest.mark.parametrize("activity", ACTIVITIES)
+@pytest.mark.parametrize("window", [None, 90])
+def test_accumulator_features_match_batch(activity: str, window: Optional[int]) -> None:
+    points, timestamps = _clip(activity)
+    series = series_to_lists(series_from_array(points, timestamps))
+    acc = feature_accumulator(activity, FPS, window)
+    for i, row in enumerate(_rows(series), start=1):
+        acc.push(row)
+        if i >= 10 and i % 15 == 0:
+            seen = _tail({k: v[:i] for k, v in series.items()}, window or i)
+            _assert_features_close(acc.features(), activity_features_from_series(activity, seen, FPS))
+
+
+@pytest.mark.parametrize("activity", ACTIVITIES)
+def test_detector_matches_batch_detection(activity: str) -> None:
+    points, timestamps = _clip(activity)
+    series = series_to_lists(series_from_array(points, timestamps))
+    detector = ActivityDetectorAccumulator()
+    for row in _rows(series):
+        detector.push(row)
+    assert classify_activity(**detector.features()) == detect_activity_from_series(series, "auto")
+
+
+@pytest.mark.parametrize("hint", ["squat", "pushup", "bowling", "auto"])
+def test_live_session_scores_like_batch(hint: str) -> None:
+    activity = "squat" if hint == "auto" else hint
+    points, timestamps = _clip(activity, frames=150)
+    session = LiveSession(activity_hint=hint, fps=FPS, window=None)
+    for frame, ts in zip(points, timestamps):
+        out = session.push(frame, float(ts))
+
+    series = series_to_lists(series_from_array(points, timestamps))
+    detected = detect_activity_from_series(series, hint)
+    features = activity_features_from_series(detected, series, FPS)
+    overall, metrics = score_activity(detected, features)
+    assert out["activity"] == detected
+    assert out["features"] == pytest.approx({k: round(v, 4) for k, v in features.items()}, abs=1e-9)
+    assert out["overall_score"] == overall
+    assert out["metrics"] == [m.model_dump() for m in metrics]